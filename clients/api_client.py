@@ -1,12 +1,27 @@
 import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
 import httpx as h
 from dotenv import load_dotenv
 
+from clients.batch import BatchResult, chunk_ids
+from clients.bulk import BulkResult, LaneBlocked, ProgressCallback, failed, rate_cap
+from clients.cache import ResponseCache
+from clients.consistency import ConsistencyGuard
+from clients.rate_limiter import RateLimiter
+from clients.response import HdeResponse, JsonDecoder, default_json_decoder
+from clients.retry import RetryPolicy, describe_error
+from clients.transport import TransportConfig
 from tickets import Tickets
 from messages import Messages
+from models import to_records
+from tickets.sharding import ShardFetchError, ShardPlanner
 from users import Users
-from utils import serialise_params
+from utils import serialise_params, extract_items
 
 load_dotenv()
 
@@ -20,12 +35,42 @@ class HdeApi:
         for page in client.tickets.get_tickets_lazy():
             ...
         all_pages = client.tickets.get_tickets_all()
+
+    prefetch_pages > 0 включает упреждающую загрузку в get_*_lazy():
+    следующие страницы качаются в пуле потоков, пока обрабатывается текущая.
+
+        client = HdeApi(TOKEN, EMAIL, BASE_URL, prefetch_pages=8)
+
+    Все запросы проходят через rate_limiter (RateLimiter): лимит частоты,
+    адаптивная параллельность и ожидание по Retry-After при 429.
+    Сбои повторяются по retry_policy (RetryPolicy).
+    Пул соединений, HTTP/2 и таймауты настраиваются через transport (TransportConfig).
+    cache (ResponseCache) включает кэш GET-запросов по id с перепроверкой по ETag.
+    Ответы — HdeResponse: json() декодируется один раз декодером json_decoder
+    (по умолчанию orjson / msgspec, если установлены, иначе stdlib json).
     """
 
-    def __init__(self, hde_token: str, hde_email: str, hde_base_url: str):
+    def __init__(
+        self,
+        hde_token: str,
+        hde_email: str,
+        hde_base_url: str,
+        prefetch_pages: int = 0,
+        rate_limiter: RateLimiter | None = None,
+        retry_policy: RetryPolicy | None = None,
+        transport: TransportConfig | None = None,
+        cache: ResponseCache | None = None,
+        json_decoder: JsonDecoder | None = None,
+    ):
         self.HDE_TOKEN = hde_token
         self.HDE_EMAIL = hde_email
         self.HDE_BASE_URL = hde_base_url
+        self.prefetch_pages = prefetch_pages
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.transport = transport or TransportConfig()
+        self.cache = cache
+        self.json_decoder = json_decoder or default_json_decoder()
         self._http = self._init_client()
 
         self.tickets = Tickets(self)
@@ -34,7 +79,17 @@ class HdeApi:
 
     def _init_client(self) -> h.Client:
         auth = h.BasicAuth(self.HDE_EMAIL, self.HDE_TOKEN)
-        return h.Client(auth=auth, base_url=self.HDE_BASE_URL, timeout=15, verify=False)
+        return self.transport.build_client(auth, self.HDE_BASE_URL)
+
+    def close(self) -> None:
+        """Закрывает соединения клиента (общий пул TransportConfig остаётся открытым)."""
+        self._http.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
 
     def _request(
         self,
@@ -42,7 +97,15 @@ class HdeApi:
         path: str,
         params: object | None = None,
         data: object | None = None,
-    ) -> h.Response | None:
+        retry: RetryPolicy | None = None,
+        idempotency_guard=None,
+    ) -> HdeResponse | None:
+        """
+        Выполняет запрос с повторами по retry (по умолчанию — self.retry_policy).
+
+        idempotency_guard вызывается перед повтором POST после неоднозначного
+        сбоя; если он вернул ответ (запрос всё-таки прошёл), повтора не будет.
+        """
         try:
             if params is not None:
                 params = serialise_params(params)
@@ -50,32 +113,138 @@ class HdeApi:
             print(f"[_request] Ошибка сериализации params: {e}")
             return None
 
+        m = method.upper()
+        if m not in ("GET", "POST", "PUT", "DELETE"):
+            print(f"[_request] Неподдерживаемый метод: {m}")
+            return None
+
+        cache_key = cached = None
+        headers = None
+        if self.cache is not None:
+            if m == "GET" and self.cache.ttl_for(path) is not None:
+                cache_key = self.cache.key(path, params)
+                cached = self.cache.get(cache_key)
+                if cached is not None and cached.fresh:
+                    return cached.response
+                if cached is not None:
+                    headers = self.cache.conditional_headers(cached)
+            elif m != "GET":
+                self.cache.invalidate(path)
+
+        policy = retry or self.retry_policy
+        started = time.monotonic()
+        attempt = 0
         try:
-            m = method.upper()
-            if m == "GET":
-                response = self._http.get(path, params=params)
-            elif m == "POST":
-                response = self._http.post(path, params=params, json=data)
-            elif m == "PUT":
-                response = self._http.put(path, params=params, json=data)
-            elif m == "DELETE":
-                response = self._http.delete(path, params=params)
-            else:
-                print(f"[_request] Неподдерживаемый метод: {m}")
-                return None
-            response.raise_for_status()
+            while True:
+                attempt += 1
+                try:
+                    response = self._send(m, path, params, data, headers)
+                    if response.status_code == 304 and cached is not None:
+                        return self.cache.not_modified(cache_key, cached)
+                    response.raise_for_status()
+                    break
+                except (h.TransportError, h.HTTPStatusError) as e:
+                    delay = policy.next_delay(
+                        m, path, attempt, started, e, guarded=idempotency_guard is not None
+                    )
+                    if delay is None:
+                        raise
+                    if idempotency_guard is not None and policy.is_ambiguous(m, e):
+                        landed = idempotency_guard()
+                        if landed is not None:
+                            return landed
+                    print(
+                        f"[_request] {m} {path}: {describe_error(e)}, повтор через {delay:.1f}с "
+                        f"({attempt}/{policy.max_attempts})"
+                    )
+                    time.sleep(delay)
         except h.ConnectError as e:
             print(f"[_request] Ошибка подключения: {e}")
             return None
         except h.HTTPStatusError as e:
             print(f"[_request] HTTP ошибка: {e}")
             return None
+        except h.TransportError as e:
+            print(f"[_request] Сетевая ошибка: {e!r}")
+            return None
 
+        if cache_key is not None:
+            self.cache.put(cache_key, path, response)
+        elif self.cache is not None and m != "GET":
+            # Повторно — на случай, если параллельный GET успел закэшировать старую версию
+            self.cache.invalidate(path)
         return response
 
-    def _paginate_lazy(self, fetch_func, params: dict):
-        """Генератор: используй for page in client.tickets.get_tickets_lazy()"""
-        current_page = 1
+    def _send(
+        self,
+        method: str,
+        path: str,
+        params: dict | None,
+        data: object | None,
+        headers: dict | None = None,
+    ) -> HdeResponse:
+        """Один HTTP-запрос под rate_limiter."""
+        self.rate_limiter.acquire()
+        response = None
+        try:
+            if method == "GET":
+                response = self._http.get(path, params=params, headers=headers)
+            elif method == "POST":
+                response = self._http.post(path, params=params, json=data, headers=headers)
+            elif method == "PUT":
+                response = self._http.put(path, params=params, json=data, headers=headers)
+            else:
+                response = self._http.delete(path, params=params, headers=headers)
+            return HdeResponse(response, self.json_decoder)
+        finally:
+            self.rate_limiter.release(response)
+
+    def _paginate_lazy(
+        self,
+        fetch_func,
+        params: dict,
+        record_cls=None,
+        checkpoint=None,
+        start_page: int = 1,
+        guard: ConsistencyGuard | None = None,
+        on_end=None,
+    ):
+        """
+        Генератор: используй for page in client.tickets.get_tickets_lazy()
+
+        on_end() вызывается, только если дошли до последней страницы; при сбое
+        запроса или разбора генератор просто заканчивается без него.
+        """
+        if record_cls is not None or checkpoint is not None or guard is not None:
+            if checkpoint is not None:
+                start_page = checkpoint.bind(params)
+            if guard is not None:
+                guard.begin(params)
+                fetch_func = guard.wrap(fetch_func)
+            pages = self._paginate_lazy(
+                fetch_func,
+                params,
+                start_page=start_page,
+                on_end=checkpoint.mark_end if checkpoint is not None else None,
+            )
+            if checkpoint is not None:
+                pages = checkpoint.track(pages)
+            if guard is not None:
+                pages = self._guarded(guard, fetch_func, params, pages)
+            try:
+                for page in pages:
+                    yield to_records(page, record_cls) if record_cls is not None else page
+            finally:
+                pages.close()
+            return
+
+        if self.prefetch_pages > 0:
+            yield from self._paginate_prefetch(
+                fetch_func, params, self.prefetch_pages, start_page, on_end
+            )
+            return
+
+        current_page = start_page
         params_copy = params.copy()
         params_copy.pop("page", None)
 
@@ -85,22 +254,352 @@ class HdeApi:
                 break
 
             try:
-                data = response.json()
-                if isinstance(data, dict):
-                    for key in ["tickets", "users", "items", "data"]:
-                        if key in data:
-                            data = data[key]
-                            break
-                if isinstance(data, dict):
-                    data = list(data.values())
+                data = extract_items(response.json())
+            except Exception as e:
+                print(f"[_paginate_lazy] Ошибка парсинга: {e}")
+                break
+            if not data:
+                if on_end is not None:
+                    on_end()
+                break
+            yield data
+
+            current_page += 1
+
+    def _paginate_prefetch(
+        self, fetch_func, params: dict, window: int, start_page: int = 1, on_end=None
+    ):
+        """
+        Генератор с упреждающей загрузкой.
+
+        Первая страница (start_page) грузится сразу, из неё берётся pagination.total_pages.
+        Дальше в пуле потоков держится не больше window запросов вперёд,
+        страницы отдаются строго по порядку.
+        """
+        params_copy = params.copy()
+        params_copy.pop("page", None)
+
+        first_response = fetch_func(**params_copy, page=start_page)
+        if first_response is None:
+            return
+
+        try:
+            first_data = first_response.json()
+            first_items = extract_items(first_data)
+        except Exception as e:
+            print(f"[_paginate_prefetch] Ошибка парсинга: {e}")
+            return
+        if not first_items:
+            if on_end is not None:
+                on_end()
+            return
+
+        total_pages = 1
+        if isinstance(first_data, dict) and "pagination" in first_data:
+            total_pages = first_data["pagination"].get("total_pages", 1)
+        yield first_items
+        if total_pages <= start_page:
+            if on_end is not None:
+                on_end()
+            return
+
+        executor = ThreadPoolExecutor(max_workers=window, thread_name_prefix="hde-prefetch")
+        pending: deque = deque()
+        next_page = start_page + 1
+
+        def submit_until_full():
+            nonlocal next_page
+            while len(pending) < window and next_page <= total_pages:
+                pending.append(executor.submit(fetch_func, **params_copy, page=next_page))
+                next_page += 1
+
+        try:
+            submit_until_full()
+            while pending:
+                response = pending.popleft().result()
+                if response is None:
+                    return
+                try:
+                    data = extract_items(response.json())
+                except Exception as e:
+                    print(f"[_paginate_prefetch] Ошибка парсинга: {e}")
+                    return
                 if not data:
                     break
+                submit_until_full()
                 yield data
+            if on_end is not None:
+                on_end()
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _paginate_keyset(self, fetch_func, params: dict, key: str, from_param: str):
+        """
+        Генератор страниц по ключу сортировки (keyset) вместо номеров страниц.
+
+        params должны сортировать по key по возрастанию. После каждой страницы
+        запрос повторяется с from_param = последнее значение key, поэтому запись,
+        изменённая во время обхода и ушедшая в конец выборки, не сдвигает
+        остальные и ничего не пропускается. Записи на стыке (тот же id и то же
+        значение key) отбрасываются. Если вся страница — одно значение key,
+        следующая берётся по номеру с тем же from_param.
+        """
+        params_copy = params.copy()
+        params_copy.pop("page", None)
+        page_number = 1
+        boundary: set[tuple] = set()
+
+        while True:
+            response = fetch_func(**params_copy, page=page_number)
+            if response is None:
+                break
+            try:
+                payload = response.json()
+                items = extract_items(payload)
             except Exception as e:
-                print(f"[_paginate_lazy] Ошибка парсинга: {e}")
+                print(f"[_paginate_keyset] Ошибка парсинга: {e}")
+                break
+            if not items:
                 break
 
-            current_page += 1
+            fresh = [r for r in items if (r.get("id"), r.get(key)) not in boundary]
+            if fresh:
+                yield fresh
+
+            total_pages = None
+            if isinstance(payload, dict) and "pagination" in payload:
+                total_pages = payload["pagination"].get("total_pages")
+            if total_pages is not None and total_pages <= page_number:
+                break
+
+            last = items[-1].get(key)
+            if last and last != params_copy.get(from_param):
+                params_copy[from_param] = last
+                boundary = {(r.get("id"), last) for r in items if r.get(key) == last}
+                page_number = 1
+            else:
+                boundary.update((r.get("id"), r.get(key)) for r in items)
+                page_number += 1
+
+    def _guarded(self, guard: ConsistencyGuard, fetch_func, params: dict, pages):
+        """Страницы без повторов по id, затем добранные записи (см. ConsistencyGuard)."""
+        try:
+            for page in pages:
+                page = guard.filter(page)
+                if page:
+                    yield page
+        finally:
+            pages.close()
+
+        params_copy = params.copy()
+        params_copy.pop("page", None)
+        while requests := guard.next_repair():
+            workers = min(len(requests), self.rate_limiter.max_concurrency)
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hde-repair") as executor:
+                responses = list(
+                    executor.map(lambda r: fetch_func(**{**params_copy, **r}), requests)
+                )
+            for request, response in zip(requests, responses):
+                page = guard.repair(response, request)
+                if page:
+                    yield page
+        guard.finish()
+
+    def _consume_pages(self, pages, sink):
+        """Скармливает страницы приёмнику (sink.feed) и возвращает sink.finish()."""
+        for page in pages:
+            sink.feed(page)
+        return sink.finish()
+
+    def _then(self, value, func):
+        """func(value) — шаг многошаговой операции (в HdeApiAsync value ещё нужно дождаться)."""
+        return func(value)
+
+    def _fetch_by_ids(
+        self, fetch_chunk, ids, chunk_size: int = 1, max_concurrent: int | None = None
+    ) -> BatchResult:
+        """
+        Загружает записи по ID пачками в пуле потоков.
+
+        fetch_chunk получает список ID (не длиннее chunk_size) и возвращает Response.
+        """
+        chunks = chunk_ids(ids, chunk_size)
+        result = BatchResult()
+        if not chunks:
+            return result
+        workers = min(len(chunks), max_concurrent or self.rate_limiter.max_concurrency)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hde-batch") as executor:
+            for chunk, response in zip(chunks, executor.map(fetch_chunk, chunks)):
+                result.add(chunk, response)
+        return result
+
+    def _run_bulk(
+        self,
+        items,
+        call,
+        max_concurrent: int | None = None,
+        dry_run: bool = False,
+        rate: float | None = None,
+        on_progress: ProgressCallback | None = None,
+    ) -> BulkResult:
+        """
+        Массовая операция в пуле потоков под rate_limiter клиента.
+
+        items — итерируемое (key, payload), читается по мере выполнения;
+        call(key, payload) возвращает HdeResponse или None. rate — доп.
+        потолок запросов в секунду именно для этой операции. dry_run только
+        собирает план, ничего не отправляя.
+        """
+        total = len(items) if hasattr(items, "__len__") else None
+        result = BulkResult(total=total)
+
+        def report(key, ok):
+            if on_progress is not None:
+                on_progress(result.done, total, key, ok)
+
+        if dry_run:
+            for key, payload in items:
+                result.plan(key, payload)
+                report(key, True)
+            return result
+
+        workers = max_concurrent or self.rate_limiter.max_concurrency
+        cap = rate_cap(rate, workers)
+
+        def run(key, payload):
+            if cap is not None:
+                cap.acquire()
+            try:
+                return call(key, payload)
+            except Exception as e:
+                return e
+            finally:
+                if cap is not None:
+                    cap.release()
+
+        def collect(futures):
+            for future in futures:
+                key = pending.pop(future)
+                report(key, result.add(key, future.result()))
+
+        pending = {}
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hde-bulk") as executor:
+            for key, payload in items:
+                pending[executor.submit(run, key, payload)] = key
+                if len(pending) >= workers * 2:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+        return result
+
+    def _stream_lanes(self, items, call, convert, max_concurrent: int | None = None):
+        """
+        Генератор: выполняет элементы параллельно, но по порядку внутри lane.
+
+        items — итерируемое (lane, key, payload); call(lane, payload) вызывается
+        для элементов одной lane строго последовательно, разные lane идут
+        в пуле потоков. После сбоя остальные элементы lane не отправляются
+        (исход — LaneBlocked). Результаты convert(key, outcome) отдаются
+        по мере готовности; вход читается с ограниченным опережением.
+        """
+        workers = max_concurrent or self.rate_limiter.max_concurrency
+        results: queue.Queue = queue.Queue()
+        lanes: dict = {}
+        broken: set = set()
+        lock = threading.Lock()
+        stopped = threading.Event()
+
+        def drain(lane):
+            while True:
+                with lock:
+                    if not lanes[lane] or stopped.is_set():
+                        del lanes[lane]
+                        return
+                    key, payload = lanes[lane].popleft()
+                    blocked = lane in broken
+                if blocked:
+                    outcome = LaneBlocked()
+                else:
+                    try:
+                        outcome = call(lane, payload)
+                    except Exception as e:
+                        outcome = e
+                    if failed(outcome):
+                        with lock:
+                            broken.add(lane)
+                results.put((key, outcome))
+
+        outstanding = 0
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hde-lanes")
+        try:
+            for lane, key, payload in items:
+                with lock:
+                    start = lane not in lanes
+                    lanes.setdefault(lane, deque()).append((key, payload))
+                if start:
+                    executor.submit(drain, lane)
+                outstanding += 1
+                while outstanding >= workers * 4:
+                    yield convert(*results.get())
+                    outstanding -= 1
+                while not results.empty():
+                    yield convert(*results.get_nowait())
+                    outstanding -= 1
+            while outstanding:
+                yield convert(*results.get())
+                outstanding -= 1
+        finally:
+            stopped.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _fetch_sharded(
+        self,
+        fetch_func,
+        params: dict,
+        max_shard_pages: int,
+        max_concurrent: int | None = None,
+        record_cls=None,
+    ) -> list:
+        """Загружает выборку окнами date_created (см. ShardPlanner) в пуле потоков."""
+        try:
+            planner = ShardPlanner(params, max_shard_pages)
+            if planner.needs_end:
+                planner.set_end(fetch_func(**planner.latest_params(), page=1))
+            if planner.needs_start:
+                planner.set_start(fetch_func(**planner.earliest_params(), page=1))
+
+            workers = max_concurrent or self.rate_limiter.max_concurrency
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hde-shard") as executor:
+                shards, probing = [], [planner.initial_shard()]
+                while probing:
+                    responses = executor.map(
+                        lambda shard: fetch_func(**planner.params_for(shard), page=1), probing
+                    )
+                    next_probing = []
+                    for shard, response in zip(probing, responses):
+                        parts = planner.assess(shard, response)
+                        if parts:
+                            next_probing.extend(parts)
+                        else:
+                            shards.append(shard)
+                    probing = next_probing
+
+                jobs = [(s, p) for s in shards for p in range(2, s.total_pages + 1)]
+                responses = executor.map(
+                    lambda job: fetch_func(**planner.params_for(job[0]), page=job[1]), jobs
+                )
+                for (shard, page), response in zip(jobs, responses):
+                    planner.add_page(shard, page, response)
+        except ShardFetchError as e:
+            print(f"[_fetch_sharded] {e}; загружаем без шардирования")
+            return self._paginate_all(fetch_func, params, record_cls)
+        return planner.merge(shards, record_cls)
 
-    def _paginate_all(self, fetch_func, params: dict) -> list:
-        return list(self._paginate_lazy(fetch_func, params))
+    def _paginate_all(
+        self, fetch_func, params: dict, record_cls=None, guard: ConsistencyGuard | None = None
+    ) -> list:
+        return list(self._paginate_lazy(fetch_func, params, record_cls, guard=guard))
@@ -1,17 +1,40 @@
 import asyncio
+import inspect
+import time
+from collections import deque
 from typing import Optional
 
 import httpx as h
 from dotenv import load_dotenv
 
+from clients.batch import BatchResult, chunk_ids
+from clients.bulk import BulkResult, LaneBlocked, ProgressCallback, failed, rate_cap
+from clients.cache import ResponseCache
+from clients.consistency import ConsistencyGuard
+from clients.rate_limiter import RateLimiter
+from clients.response import HdeResponse, JsonDecoder, default_json_decoder
+from clients.retry import RetryPolicy, describe_error
+from clients.transport import TransportConfig
 from tickets import Tickets
 from messages import Messages
+from models import to_records
+from tickets.sharding import ShardFetchError, ShardPlanner
 from users import Users
-from utils import serialise_params
+from utils import serialise_params, extract_items
 
 load_dotenv()
 
 
+class _Flight:
+    """Объединённый GET в полёте и число вызовов, которые ждут его результат."""
+
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
 class HdeApiAsync:
     """
     Асинхронный клиент. Используется через async with:
@@ -21,12 +44,49 @@ class HdeApiAsync:
             async for page in client.tickets.get_tickets_lazy():
                 ...
             all_pages = await client.tickets.get_tickets_all()
+
+    prefetch_pages > 0 включает упреждающую загрузку в get_*_lazy():
+    до prefetch_pages запросов в полёте, страницы отдаются по порядку,
+    в буфере не больше prefetch_pages страниц.
+
+    Все запросы проходят через rate_limiter (RateLimiter); его можно
+    разделить с синхронным HdeApi, чтобы оба клиента жили в одной квоте.
+    Сбои повторяются по retry_policy (RetryPolicy).
+    Пул соединений, HTTP/2 и таймауты настраиваются через transport (TransportConfig).
+    cache (ResponseCache) включает кэш GET-запросов по id с перепроверкой по ETag.
+    Ответы — HdeResponse: json() декодируется один раз декодером json_decoder
+    (по умолчанию orjson / msgspec, если установлены, иначе stdlib json).
+
+    Одинаковые одновременные GET (метод + путь + параметры) объединяются:
+    запрос уходит один, остальные вызовы ждут его результат. Запрос
+    отменяется, когда отменены все, кто его ждал. max_coalesced
+    ограничивает таблицу запросов в полёте (0 — выключить объединение).
     """
 
-    def __init__(self, hde_token: str, hde_email: str, hde_base_url: str):
+    def __init__(
+        self,
+        hde_token: str,
+        hde_email: str,
+        hde_base_url: str,
+        prefetch_pages: int = 0,
+        rate_limiter: RateLimiter | None = None,
+        retry_policy: RetryPolicy | None = None,
+        transport: TransportConfig | None = None,
+        cache: ResponseCache | None = None,
+        json_decoder: JsonDecoder | None = None,
+        max_coalesced: int = 1024,
+    ):
         self.HDE_TOKEN = hde_token
         self.HDE_EMAIL = hde_email
         self.HDE_BASE_URL = hde_base_url
+        self.prefetch_pages = prefetch_pages
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.transport = transport or TransportConfig()
+        self.cache = cache
+        self.json_decoder = json_decoder or default_json_decoder()
+        self.max_coalesced = max_coalesced
+        self._inflight: dict[tuple, _Flight] = {}
         self.auth = h.BasicAuth(self.HDE_EMAIL, self.HDE_TOKEN)
         self._client: Optional[h.AsyncClient] = None
 
@@ -35,12 +95,7 @@ class HdeApiAsync:
         self.users = Users(self)
 
     async def __aenter__(self):
-        self._client = h.AsyncClient(
-            auth=self.auth,
-            base_url=self.HDE_BASE_URL,
-            timeout=15,
-            verify=False,
-        )
+        self._client = await self.transport.build_async_client(self.auth, self.HDE_BASE_URL)
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
@@ -61,7 +116,15 @@ class HdeApiAsync:
         path: str,
         params: object | None = None,
         data: object | None = None,
-    ) -> h.Response | None:
+        retry: RetryPolicy | None = None,
+        idempotency_guard=None,
+    ) -> HdeResponse | None:
+        """
+        Выполняет запрос с повторами по retry (по умолчанию — self.retry_policy).
+
+        idempotency_guard вызывается перед повтором POST после неоднозначного
+        сбоя; если он вернул ответ (запрос всё-таки прошёл), повтора не будет.
+        """
         try:
             if params is not None:
                 params = serialise_params(params)
@@ -69,32 +132,184 @@ class HdeApiAsync:
             print(f"[_request] Ошибка сериализации params: {e}")
             return None
 
+        m = method.upper()
+        if m not in ("GET", "POST", "PUT", "DELETE"):
+            print(f"[_request] Неподдерживаемый метод: {m}")
+            return None
+
+        if m != "GET" or self.max_coalesced <= 0:
+            return await self._perform(m, path, params, data, retry, idempotency_guard)
+
+        key = (path.strip("/"), tuple(sorted((k, str(v)) for k, v in (params or {}).items())))
+        flight = self._inflight.get(key)
+        if flight is None:
+            if len(self._inflight) >= self.max_coalesced:
+                return await self._perform(m, path, params, data, retry, idempotency_guard)
+            flight = _Flight(asyncio.ensure_future(self._perform(m, path, params, data, retry)))
+            self._inflight[key] = flight
+            flight.task.add_done_callback(lambda _: self._forget_flight(key, flight))
+        flight.waiters += 1
         try:
-            m = method.upper()
-            if m == "GET":
-                response = await self.client.get(path, params=params)
-            elif m == "POST":
-                response = await self.client.post(path, params=params, json=data)
-            elif m == "PUT":
-                response = await self.client.put(path, params=params, json=data)
-            elif m == "DELETE":
-                response = await self.client.delete(path, params=params)
-            else:
-                print(f"[_request] Неподдерживаемый метод: {m}")
-                return None
-            response.raise_for_status()
+            # shield: отмена одного ожидающего не отменяет запрос, пока его ждут другие
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                # Последний ожидающий ушёл — запрос больше никому не нужен
+                self._forget_flight(key, flight)
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def _forget_flight(self, key: tuple, flight: _Flight) -> None:
+        if self._inflight.get(key) is flight:
+            del self._inflight[key]
+        task = flight.task
+        if task.done() and not task.cancelled():
+            task.exception()  # помечаем исключение как полученное, его уже видят ожидающие
+
+    async def _perform(
+        self,
+        m: str,
+        path: str,
+        params: dict | None,
+        data: object | None,
+        retry: RetryPolicy | None = None,
+        idempotency_guard=None,
+    ) -> HdeResponse | None:
+        """Кэш, отправка и повторы для уже подготовленного запроса."""
+        cache_key = cached = None
+        headers = None
+        if self.cache is not None:
+            if m == "GET" and self.cache.ttl_for(path) is not None:
+                cache_key = self.cache.key(path, params)
+                cached = self.cache.get(cache_key)
+                if cached is not None and cached.fresh:
+                    return cached.response
+                if cached is not None:
+                    headers = self.cache.conditional_headers(cached)
+            elif m != "GET":
+                self.cache.invalidate(path)
+
+        policy = retry or self.retry_policy
+        started = time.monotonic()
+        attempt = 0
+        try:
+            while True:
+                attempt += 1
+                try:
+                    response = await self._send(m, path, params, data, headers)
+                    if response.status_code == 304 and cached is not None:
+                        return self.cache.not_modified(cache_key, cached)
+                    response.raise_for_status()
+                    break
+                except (h.TransportError, h.HTTPStatusError) as e:
+                    delay = policy.next_delay(
+                        m, path, attempt, started, e, guarded=idempotency_guard is not None
+                    )
+                    if delay is None:
+                        raise
+                    if idempotency_guard is not None and policy.is_ambiguous(m, e):
+                        landed = await idempotency_guard()
+                        if landed is not None:
+                            return landed
+                    print(
+                        f"[_request] {m} {path}: {describe_error(e)}, повтор через {delay:.1f}с "
+                        f"({attempt}/{policy.max_attempts})"
+                    )
+                    await asyncio.sleep(delay)
         except h.ConnectError as e:
             print(f"[_request] Ошибка подключения: {e}")
             return None
         except h.HTTPStatusError as e:
             print(f"[_request] HTTP ошибка: {e}")
             return None
+        except h.TransportError as e:
+            print(f"[_request] Сетевая ошибка: {e!r}")
+            return None
 
+        if cache_key is not None:
+            self.cache.put(cache_key, path, response)
+        elif self.cache is not None and m != "GET":
+            # Повторно — на случай, если параллельный GET успел закэшировать старую версию
+            self.cache.invalidate(path)
         return response
 
-    async def _paginate_lazy(self, fetch_func, params: dict):
-        """Async-генератор: используй async for page in client.tickets.get_tickets_lazy()"""
-        current_page = 1
+    async def _send(
+        self,
+        method: str,
+        path: str,
+        params: dict | None,
+        data: object | None,
+        headers: dict | None = None,
+    ) -> HdeResponse:
+        """Один HTTP-запрос под rate_limiter."""
+        await self.rate_limiter.acquire_async()
+        response = None
+        try:
+            if method == "GET":
+                response = await self.client.get(path, params=params, headers=headers)
+            elif method == "POST":
+                response = await self.client.post(path, params=params, json=data, headers=headers)
+            elif method == "PUT":
+                response = await self.client.put(path, params=params, json=data, headers=headers)
+            else:
+                response = await self.client.delete(path, params=params, headers=headers)
+            return HdeResponse(response, self.json_decoder)
+        finally:
+            self.rate_limiter.release(response)
+
+    async def _paginate_lazy(
+        self,
+        fetch_func,
+        params: dict,
+        record_cls=None,
+        checkpoint=None,
+        start_page: int = 1,
+        guard: ConsistencyGuard | None = None,
+        on_end=None,
+    ):
+        """
+        Async-генератор: используй async for page in client.tickets.get_tickets_lazy()
+
+        on_end() вызывается, только если дошли до последней страницы; при сбое
+        запроса или разбора генератор просто заканчивается без него.
+        """
+        if record_cls is not None or checkpoint is not None or guard is not None:
+            if checkpoint is not None:
+                start_page = checkpoint.bind(params)
+            if guard is not None:
+                guard.begin(params)
+                fetch_func = guard.wrap_async(fetch_func)
+            pages = self._paginate_lazy(
+                fetch_func,
+                params,
+                start_page=start_page,
+                on_end=checkpoint.mark_end if checkpoint is not None else None,
+            )
+            if checkpoint is not None:
+                pages = checkpoint.track_async(pages)
+            if guard is not None:
+                pages = self._guarded(guard, fetch_func, params, pages)
+            try:
+                async for page in pages:
+                    yield to_records(page, record_cls) if record_cls is not None else page
+            finally:
+                await pages.aclose()
+            return
+
+        if self.prefetch_pages > 0:
+            pages = self._paginate_prefetch(
+                fetch_func, params, self.prefetch_pages, start_page, on_end
+            )
+            try:
+                async for page in pages:
+                    yield page
+            finally:
+                await pages.aclose()
+            return
+
+        current_page = start_page
         params_copy = params.copy()
         params_copy.pop("page", None)
 
@@ -104,35 +319,389 @@ class HdeApiAsync:
                 break
 
             try:
-                data = response.json()
-                if isinstance(data, dict):
-                    for key in ["tickets", "users", "items", "data"]:
-                        if key in data:
-                            data = data[key]
-                            break
-                if isinstance(data, dict):
-                    data = list(data.values())
+                data = extract_items(response.json())
+            except Exception as e:
+                print(f"[_paginate_lazy] Ошибка парсинга: {e}")
+                break
+            if not data:
+                if on_end is not None:
+                    on_end()
+                break
+            yield data
+
+            current_page += 1
+
+    async def _paginate_prefetch(
+        self, fetch_func, params: dict, window: int, start_page: int = 1, on_end=None
+    ):
+        """
+        Async-генератор с упреждающей загрузкой.
+
+        Первая страница (start_page) грузится сразу, из неё берётся pagination.total_pages.
+        Дальше в полёте держится не больше window задач; готовые страницы
+        ждут своей очереди, поэтому порядок сохраняется. Если потребитель
+        выходит из цикла раньше, незавершённые задачи отменяются.
+        """
+        params_copy = params.copy()
+        params_copy.pop("page", None)
+
+        first_response = await fetch_func(**params_copy, page=start_page)
+        if first_response is None:
+            return
+
+        try:
+            first_data = first_response.json()
+            first_items = extract_items(first_data)
+        except Exception as e:
+            print(f"[_paginate_prefetch] Ошибка парсинга: {e}")
+            return
+        if not first_items:
+            if on_end is not None:
+                on_end()
+            return
+
+        total_pages = 1
+        if isinstance(first_data, dict) and "pagination" in first_data:
+            total_pages = first_data["pagination"].get("total_pages", 1)
+        yield first_items
+        if total_pages <= start_page:
+            if on_end is not None:
+                on_end()
+            return
+
+        pending: deque[asyncio.Task] = deque()
+        next_page = start_page + 1
+
+        def schedule_until_full():
+            nonlocal next_page
+            while len(pending) < window and next_page <= total_pages:
+                pending.append(asyncio.ensure_future(fetch_func(**params_copy, page=next_page)))
+                next_page += 1
+
+        try:
+            schedule_until_full()
+            while pending:
+                response = await pending.popleft()
+                if response is None:
+                    return
+                try:
+                    data = extract_items(response.json())
+                except Exception as e:
+                    print(f"[_paginate_prefetch] Ошибка парсинга: {e}")
+                    return
                 if not data:
                     break
+                schedule_until_full()
                 yield data
+            if on_end is not None:
+                on_end()
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _paginate_keyset(self, fetch_func, params: dict, key: str, from_param: str):
+        """
+        Генератор страниц по ключу сортировки (keyset) вместо номеров страниц.
+
+        params должны сортировать по key по возрастанию. После каждой страницы
+        запрос повторяется с from_param = последнее значение key, поэтому запись,
+        изменённая во время обхода и ушедшая в конец выборки, не сдвигает
+        остальные и ничего не пропускается. Записи на стыке (тот же id и то же
+        значение key) отбрасываются. Если вся страница — одно значение key,
+        следующая берётся по номеру с тем же from_param.
+        """
+        params_copy = params.copy()
+        params_copy.pop("page", None)
+        page_number = 1
+        boundary: set[tuple] = set()
+
+        while True:
+            response = await fetch_func(**params_copy, page=page_number)
+            if response is None:
+                break
+            try:
+                payload = response.json()
+                items = extract_items(payload)
             except Exception as e:
-                print(f"[_paginate_lazy] Ошибка парсинга: {e}")
+                print(f"[_paginate_keyset] Ошибка парсинга: {e}")
+                break
+            if not items:
                 break
 
-            current_page += 1
+            fresh = [r for r in items if (r.get("id"), r.get(key)) not in boundary]
+            if fresh:
+                yield fresh
+
+            total_pages = None
+            if isinstance(payload, dict) and "pagination" in payload:
+                total_pages = payload["pagination"].get("total_pages")
+            if total_pages is not None and total_pages <= page_number:
+                break
+
+            last = items[-1].get(key)
+            if last and last != params_copy.get(from_param):
+                params_copy[from_param] = last
+                boundary = {(r.get("id"), last) for r in items if r.get(key) == last}
+                page_number = 1
+            else:
+                boundary.update((r.get("id"), r.get(key)) for r in items)
+                page_number += 1
+
+    async def _guarded(self, guard: ConsistencyGuard, fetch_func, params: dict, pages):
+        """Страницы без повторов по id, затем добранные записи (см. ConsistencyGuard)."""
+        try:
+            async for page in pages:
+                page = guard.filter(page)
+                if page:
+                    yield page
+        finally:
+            await pages.aclose()
+
+        async for page in self._repair(guard, fetch_func, params):
+            yield page
+
+    async def _repair(self, guard: ConsistencyGuard, fetch_func, params: dict):
+        params_copy = params.copy()
+        params_copy.pop("page", None)
+        semaphore = asyncio.Semaphore(self.rate_limiter.max_concurrency)
+
+        async def fetch(request):
+            async with semaphore:
+                return await fetch_func(**{**params_copy, **request})
+
+        while requests := guard.next_repair():
+            responses = await asyncio.gather(*(fetch(r) for r in requests))
+            for request, response in zip(requests, responses):
+                page = guard.repair(response, request)
+                if page:
+                    yield page
+        guard.finish()
+
+    async def _consume_pages(self, pages, sink):
+        """Скармливает страницы приёмнику (sink.feed) и возвращает sink.finish()."""
+        async for page in pages:
+            sink.feed(page)
+        return sink.finish()
+
+    async def _then(self, value, func):
+        """await value (если нужно), затем func(результат); корутину из func тоже ждём."""
+        if inspect.isawaitable(value):
+            value = await value
+        result = func(value)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    async def _fetch_by_ids(
+        self, fetch_chunk, ids, chunk_size: int = 1, max_concurrent: int | None = None
+    ) -> BatchResult:
+        """
+        Загружает записи по ID пачками параллельно.
+
+        fetch_chunk получает список ID (не длиннее chunk_size) и возвращает корутину с Response.
+        """
+        chunks = chunk_ids(ids, chunk_size)
+        semaphore = asyncio.Semaphore(max_concurrent or self.rate_limiter.max_concurrency)
+
+        async def fetch(chunk):
+            async with semaphore:
+                return await fetch_chunk(chunk)
+
+        responses = await asyncio.gather(*(fetch(c) for c in chunks))
+        result = BatchResult()
+        for chunk, response in zip(chunks, responses):
+            result.add(chunk, response)
+        return result
+
+    async def _run_bulk(
+        self,
+        items,
+        call,
+        max_concurrent: int | None = None,
+        dry_run: bool = False,
+        rate: float | None = None,
+        on_progress: ProgressCallback | None = None,
+    ) -> BulkResult:
+        """
+        Массовая операция: не больше max_concurrent задач под rate_limiter клиента.
+
+        items — итерируемое (key, payload), читается по мере выполнения;
+        call(key, payload) возвращает корутину с HdeResponse или None. rate —
+        доп. потолок запросов в секунду именно для этой операции. dry_run
+        только собирает план, ничего не отправляя.
+        """
+        total = len(items) if hasattr(items, "__len__") else None
+        result = BulkResult(total=total)
+
+        def report(key, ok):
+            if on_progress is not None:
+                on_progress(result.done, total, key, ok)
+
+        if dry_run:
+            for key, payload in items:
+                result.plan(key, payload)
+                report(key, True)
+            return result
+
+        workers = max_concurrent or self.rate_limiter.max_concurrency
+        cap = rate_cap(rate, workers)
+        semaphore = asyncio.Semaphore(workers)
+
+        async def run(key, payload):
+            try:
+                if cap is not None:
+                    await cap.acquire_async()
+                try:
+                    outcome = await call(key, payload)
+                except Exception as e:
+                    outcome = e
+                finally:
+                    if cap is not None:
+                        cap.release()
+                report(key, result.add(key, outcome))
+            finally:
+                semaphore.release()
+
+        tasks = set()
+        try:
+            for key, payload in items:
+                await semaphore.acquire()
+                task = asyncio.ensure_future(run(key, payload))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+        return result
+
+    async def _stream_lanes(self, items, call, convert, max_concurrent: int | None = None):
+        """
+        Async-генератор: элементы параллельно, но по порядку внутри lane.
+
+        items — итерируемое (lane, key, payload); call(lane, payload) для
+        элементов одной lane выполняется строго последовательно, разные lane —
+        параллельно (не больше max_concurrent запросов). После сбоя остальные
+        элементы lane не отправляются (исход — LaneBlocked). Результаты
+        convert(key, outcome) отдаются по мере готовности.
+        """
+        workers = max_concurrent or self.rate_limiter.max_concurrency
+        semaphore = asyncio.Semaphore(workers)
+        results: asyncio.Queue = asyncio.Queue()
+        lanes: dict = {}
+        broken: set = set()
+        tasks = set()
+
+        async def drain(lane):
+            while lanes[lane]:
+                key, payload = lanes[lane].popleft()
+                if lane in broken:
+                    outcome = LaneBlocked()
+                else:
+                    try:
+                        async with semaphore:
+                            outcome = call(lane, payload)
+                            if inspect.isawaitable(outcome):
+                                outcome = await outcome
+                    except Exception as e:
+                        outcome = e
+                    if failed(outcome):
+                        broken.add(lane)
+                results.put_nowait((key, outcome))
+            del lanes[lane]
+
+        outstanding = 0
+        try:
+            for lane, key, payload in items:
+                start = lane not in lanes
+                lanes.setdefault(lane, deque()).append((key, payload))
+                if start:
+                    task = asyncio.ensure_future(drain(lane))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                outstanding += 1
+                while outstanding >= workers * 4:
+                    yield convert(*await results.get())
+                    outstanding -= 1
+                while not results.empty():
+                    yield convert(*results.get_nowait())
+                    outstanding -= 1
+            while outstanding:
+                yield convert(*await results.get())
+                outstanding -= 1
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _fetch_sharded(
+        self,
+        fetch_func,
+        params: dict,
+        max_shard_pages: int,
+        max_concurrent: int | None = None,
+        record_cls=None,
+    ) -> list:
+        """Загружает выборку окнами date_created (см. ShardPlanner) параллельно."""
+        try:
+            planner = ShardPlanner(params, max_shard_pages)
+            if planner.needs_end:
+                planner.set_end(await fetch_func(**planner.latest_params(), page=1))
+            if planner.needs_start:
+                planner.set_start(await fetch_func(**planner.earliest_params(), page=1))
+
+            semaphore = asyncio.Semaphore(max_concurrent or self.rate_limiter.max_concurrency)
+
+            async def fetch(shard, page):
+                async with semaphore:
+                    return await fetch_func(**planner.params_for(shard), page=page)
+
+            shards, probing = [], [planner.initial_shard()]
+            while probing:
+                responses = await asyncio.gather(*(fetch(shard, 1) for shard in probing))
+                next_probing = []
+                for shard, response in zip(probing, responses):
+                    parts = planner.assess(shard, response)
+                    if parts:
+                        next_probing.extend(parts)
+                    else:
+                        shards.append(shard)
+                probing = next_probing
+
+            jobs = [(s, p) for s in shards for p in range(2, s.total_pages + 1)]
+            responses = await asyncio.gather(*(fetch(shard, page) for shard, page in jobs))
+            for (shard, page), response in zip(jobs, responses):
+                planner.add_page(shard, page, response)
+        except ShardFetchError as e:
+            print(f"[_fetch_sharded] {e}; загружаем без шардирования")
+            return await self._paginate_all(fetch_func, params, record_cls)
+        return planner.merge(shards, record_cls)
 
     async def _paginate_all(
         self,
         fetch_func,
         params: dict,
-        max_concurrent: int = 5,
+        max_concurrent: int | None = None,
+        record_cls=None,
+        guard: ConsistencyGuard | None = None,
     ) -> list:
         """
         Загружает все страницы параллельно.
         Используй: all_pages = await client.tickets.get_tickets_all()
+
+        Фактическую параллельность регулирует rate_limiter; max_concurrent
+        лишь ограничивает число одновременно созданных задач
+        (по умолчанию — rate_limiter.max_concurrency).
+        С guard (ConsistencyGuard) повторы по id отбрасываются, а пропущенные
+        из-за сдвига страниц записи добираются отдельными страницами в конце.
         """
         params_copy = params.copy()
         params_copy.pop("page", None)
+        if guard is not None:
+            guard.begin(params)
+            fetch_func = guard.wrap_async(fetch_func)
 
         first_response = await fetch_func(**params_copy, page=1)
         if not first_response:
@@ -140,34 +709,34 @@ class HdeApiAsync:
 
         first_data = first_response.json()
 
-        def _extract(data):
-            if isinstance(data, dict):
-                for key in ["tickets", "users", "items", "data"]:
-                    if key in data:
-                        data = data[key]
-                        break
-            if isinstance(data, dict):
-                data = list(data.values())
-            return data
+        def convert(page):
+            if guard is not None:
+                page = guard.filter(page)
+            return to_records(page, record_cls) if record_cls is not None else page
 
-        all_pages = [_extract(first_data)]
+        all_pages = [convert(extract_items(first_data))]
 
         total_pages = 1
         if isinstance(first_data, dict) and "pagination" in first_data:
             total_pages = first_data["pagination"].get("total_pages", 1)
 
         if total_pages > 1:
-            semaphore = asyncio.Semaphore(max_concurrent)
+            semaphore = asyncio.Semaphore(max_concurrent or self.rate_limiter.max_concurrency)
 
             async def fetch_page(page_num):
                 async with semaphore:
                     response = await fetch_func(**params_copy, page=page_num)
                     if response:
-                        return _extract(response.json())
+                        return extract_items(response.json())
                     return []
 
             tasks = [fetch_page(p) for p in range(2, total_pages + 1)]
             remaining = await asyncio.gather(*tasks)
-            all_pages.extend(remaining)
+            all_pages.extend(convert(page) for page in remaining)
+
+        if guard is not None:
+            all_pages = [page for page in all_pages if page]
+            async for page in self._repair(guard, fetch_func, params_copy):
+                all_pages.append(to_records(page, record_cls) if record_cls is not None else page)
 
         return all_pages
@@ -0,0 +1,37 @@
+from dataclasses import dataclass, field
+from typing import Any
+
+from clients.response import HdeResponse
+from utils import extract_items
+
+
+@dataclass
+class BatchResult:
+    """Результат выборки по списку ID: найденные записи по id и промахи."""
+
+    found: dict[int, dict[str, Any]] = field(default_factory=dict)
+    missing: list[int] = field(default_factory=list)
+
+    def add(self, chunk: list[int], response: HdeResponse | None) -> None:
+        if response is not None:
+            for record in records_from(response):
+                record_id = int(record["id"])
+                if record_id in chunk:
+                    self.found[record_id] = record
+        self.missing.extend(i for i in chunk if i not in self.found)
+
+
+def records_from(response: HdeResponse) -> list[dict[str, Any]]:
+    """Записи из ответа: и списка (data: {id: {...}}), и одиночного (data: {...})."""
+    payload = response.json()
+    if isinstance(payload, dict) and isinstance(payload.get("data"), dict):
+        if "id" in payload["data"]:
+            return [payload["data"]]
+    items = extract_items(payload)
+    return [r for r in items or [] if isinstance(r, dict) and "id" in r]
+
+
+def chunk_ids(ids, chunk_size: int) -> list[list[int]]:
+    """Уникальные ID (в исходном порядке), разбитые на пачки по chunk_size."""
+    unique = list(dict.fromkeys(int(i) for i in ids))
+    return [unique[i:i + chunk_size] for i in range(0, len(unique), chunk_size)]
@@ -0,0 +1,74 @@
+from dataclasses import dataclass, field
+from typing import Any, Callable, Hashable
+
+from clients.batch import records_from
+from clients.rate_limiter import RateLimiter
+
+# on_progress(done, total, key, ok): total — None, если вход не поддерживает len()
+ProgressCallback = Callable[[int, int | None, Hashable, bool], None]
+
+NO_RESPONSE = "нет ответа (подробности в логе _request)"
+
+
+@dataclass
+class BulkResult:
+    """
+    Результат массовой операции (HdeApi._run_bulk).
+
+    succeeded — ключ → data из ответа, failed — ключ → описание ошибки,
+    planned — ключ → payload (dry_run: запросы не отправлялись).
+    """
+
+    total: int | None = None
+    succeeded: dict[Hashable, Any] = field(default_factory=dict)
+    failed: dict[Hashable, str] = field(default_factory=dict)
+    planned: dict[Hashable, Any] = field(default_factory=dict)
+
+    @property
+    def done(self) -> int:
+        return len(self.succeeded) + len(self.failed) + len(self.planned)
+
+    @property
+    def ok(self) -> bool:
+        return not self.failed
+
+    def add(self, key: Hashable, outcome) -> bool:
+        """Учитывает исход одного элемента: ответ, None или исключение."""
+        if isinstance(outcome, BaseException):
+            self.failed[key] = f"{type(outcome).__name__}: {outcome}"
+            return False
+        if outcome is None:
+            self.failed[key] = NO_RESPONSE
+            return False
+        records = records_from(outcome) if outcome.content else []
+        self.succeeded[key] = records[0] if records else None
+        return True
+
+    def plan(self, key: Hashable, payload: Any) -> None:
+        self.planned[key] = payload
+
+    def summary(self) -> str:
+        if self.planned:
+            return f"dry-run: запланировано {len(self.planned)}"
+        return f"успешно {len(self.succeeded)}, с ошибкой {len(self.failed)}"
+
+
+class LaneBlocked(Exception):
+    """Элемент не отправлен: предыдущий в той же очереди (lane) завершился ошибкой."""
+
+
+def failed(outcome) -> bool:
+    return outcome is None or isinstance(outcome, BaseException)
+
+
+def rate_cap(rate: float | None, concurrency: int) -> RateLimiter | None:
+    """Отдельный лимит частоты для массовой операции поверх лимитов клиента."""
+    if not rate:
+        return None
+    return RateLimiter(
+        rate=rate,
+        burst=1,
+        initial_concurrency=concurrency,
+        min_concurrency=concurrency,
+        max_concurrency=concurrency,
+    )
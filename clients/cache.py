@@ -0,0 +1,172 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from urllib.parse import urlencode
+
+from clients.response import HdeResponse
+
+# Эндпоинты «по id», которые кэшируются по умолчанию: паттерн пути → TTL, секунды
+DEFAULT_TTLS = {
+    r"tickets/\d+/?": 30.0,
+    r"users/\d+/?": 300.0,
+}
+
+
+@dataclass
+class CacheEntry:
+    response: HdeResponse
+    path: str
+    expires_at: float
+    size: int
+    etag: str | None = None
+    last_modified: str | None = None
+
+    @property
+    def fresh(self) -> bool:
+        return time.monotonic() < self.expires_at
+
+    @property
+    def revalidatable(self) -> bool:
+        return self.etag is not None or self.last_modified is not None
+
+
+class ResponseCache:
+    """
+    TTL + LRU кэш GET-ответов для HdeApi / HdeApiAsync (включается явно).
+
+    Кэшируются только пути, совпавшие с паттернами ttls. Устаревшая запись
+    перепроверяется условным запросом (If-None-Match / If-Modified-Since),
+    если сервер отдал ETag или Last-Modified. PUT / POST / DELETE на ресурс
+    сбрасывают его записи (tickets/123/posts/ сбрасывает tickets/123/).
+
+        cache = ResponseCache(max_entries=5000, max_bytes=64 * 1024 * 1024)
+        client = HdeApi(TOKEN, EMAIL, BASE_URL, cache=cache)
+
+    Args:
+        ttls: Паттерн пути → TTL в секундах (по умолчанию DEFAULT_TTLS).
+        max_entries: Максимум записей.
+        max_bytes: Максимальный суммарный размер тел ответов.
+    """
+
+    def __init__(
+        self,
+        ttls: dict[str, float] | None = None,
+        max_entries: int = 1024,
+        max_bytes: int = 32 * 1024 * 1024,
+    ):
+        self.ttls = [(re.compile(p), ttl) for p, ttl in (ttls or DEFAULT_TTLS).items()]
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def ttl_for(self, path: str) -> float | None:
+        path = path.lstrip("/")
+        for pattern, ttl in self.ttls:
+            if pattern.fullmatch(path):
+                return ttl
+        return None
+
+    @staticmethod
+    def key(path: str, params: dict | None) -> str:
+        path = path.strip("/")
+        if not params:
+            return path
+        return f"{path}?{urlencode(sorted(params.items()), doseq=True)}"
+
+    # ── Чтение / запись ──────────────────────────────────────────────────────
+
+    def get(self, key: str) -> CacheEntry | None:
+        """Запись по ключу (свежая или годная для перепроверки), иначе None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.fresh:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            if not entry.revalidatable:
+                self._drop(key)
+                self.misses += 1
+                return None
+            return entry
+
+    def conditional_headers(self, entry: CacheEntry) -> dict[str, str]:
+        headers = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def not_modified(self, key: str, entry: CacheEntry) -> HdeResponse:
+        """Сервер ответил 304 — продлеваем запись и отдаём её ответ."""
+        ttl = self.ttl_for(entry.path) or 0.0
+        with self._lock:
+            entry.expires_at = time.monotonic() + ttl
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            self.revalidated += 1
+        return entry.response
+
+    def put(self, key: str, path: str, response: HdeResponse) -> None:
+        ttl = self.ttl_for(path)
+        if ttl is None or "no-store" in response.headers.get("Cache-Control", ""):
+            return
+        size = len(response.content)
+        if size > self.max_bytes:
+            return
+        entry = CacheEntry(
+            response=response,
+            path=path.strip("/"),
+            expires_at=time.monotonic() + ttl,
+            size=size,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = entry
+            self._bytes += size
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                self._drop(next(iter(self._entries)))
+
+    # ── Инвалидация ──────────────────────────────────────────────────────────
+
+    def invalidate(self, path: str) -> None:
+        """Сбрасывает все записи ресурса (первые два сегмента пути, например tickets/123)."""
+        resource = path.strip("/").split("/")[:2]
+        with self._lock:
+            stale = [
+                k for k, e in self._entries.items() if e.path.split("/")[:2] == resource
+            ]
+            for k in stale:
+                self._drop(k)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
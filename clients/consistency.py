@@ -0,0 +1,331 @@
+import threading
+from dataclasses import dataclass, field
+
+from utils import extract_items
+
+
+class IdBitmap:
+    """Компактное множество неотрицательных целых id: один бит на id."""
+
+    __slots__ = ("_bits", "_count")
+
+    def __init__(self):
+        self._bits = bytearray()
+        self._count = 0
+
+    def add(self, item_id: int) -> bool:
+        """Добавляет id; False, если он уже был."""
+        index, mask = item_id >> 3, 1 << (item_id & 7)
+        if index >= len(self._bits):
+            self._bits.extend(bytes(max(index + 1 - len(self._bits), len(self._bits) // 2)))
+        if self._bits[index] & mask:
+            return False
+        self._bits[index] |= mask
+        self._count += 1
+        return True
+
+    def __contains__(self, item_id: int) -> bool:
+        index = item_id >> 3
+        return index < len(self._bits) and bool(self._bits[index] & (1 << (item_id & 7)))
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self._bits)
+
+
+# Сколько мест проверять за раз при общем поиске пропусков
+_SWEEP_BATCH = 10
+
+# Поле сортировки → фильтры «от» / «до», которыми можно запросить окно значений
+_WINDOW_FILTERS = {
+    "date_created": ("from_date_created", "to_date_created"),
+    "date_updated": ("from_date_updated", "to_date_updated"),
+}
+
+
+@dataclass
+class ConsistencyReport:
+    """
+    Отчёт о прогоне пагинации под ConsistencyGuard.
+
+    expected — последний увиденный pagination.total, unique — сколько
+    уникальных записей отдано, duplicates — id → число повторов,
+    drift — (страница, total на предыдущей, total на этой),
+    repaired — id, добранные повторными запросами repair_requests
+    (параметры поверх исходных: {'page': N} или окно по полю сортировки),
+    unchecked — сколько повторных запросов не сделано из-за max_repair_pages.
+    """
+
+    expected: int | None = None
+    received: int = 0
+    unique: int = 0
+    duplicates: dict[int, int] = field(default_factory=dict)
+    drift: list[tuple[int, int, int]] = field(default_factory=list)
+    repaired: list[int] = field(default_factory=list)
+    repair_requests: list[dict] = field(default_factory=list)
+    unchecked: int = 0
+
+    @property
+    def missing(self) -> int:
+        if self.expected is None:
+            return 0
+        return max(0, self.expected - self.unique)
+
+    @property
+    def consistent(self) -> bool:
+        return self.missing == 0
+
+    def summary(self) -> str:
+        text = (
+            f"ожидалось {self.expected}, получено {self.unique} уникальных "
+            f"({self.received} всего), повторов {sum(self.duplicates.values())}, "
+            f"сдвигов {len(self.drift)}, добрано {len(self.repaired)} "
+            f"за {len(self.repair_requests)} запр., не хватает {self.missing}"
+        )
+        if self.unchecked:
+            text += f", не проверено {self.unchecked} мест (лимит повторных запросов)"
+        return text
+
+
+class ConsistencyGuard:
+    """
+    Защита постраничной выборки от сдвига страниц.
+
+    Пока выборка идёт, заявки создаются и меняются, поэтому номера страниц
+    «плывут»: одни записи приходят дважды, другие пропускаются. Guard
+    отбрасывает повторы по id (IdBitmap), запоминает pagination.total и
+    крайние значения поля сортировки каждой страницы и после выборки сверяет
+    число уникальных записей с total.
+
+    Пропуски возможны только на стыках страниц. Если order_by — date_created
+    или date_updated, стык (p-1, p), где total изменился, перепроверяется
+    окном значений между последней записью страницы p-1 и первой записью
+    страницы p (from_/to_date_*): окно не зависит от сдвига номеров. При
+    другой сортировке перезагружаются страницы p-1 и p. Если записей всё ещё
+    меньше total, проверяются окна до первой и после последней записи
+    и остальные стыки (или страницы) — сначала ближайшие к сдвигам.
+    Всего не больше max_repair_pages запросов; что не влезло, попадает
+    в report.unchecked. Добранные записи отдаются дополнительными страницами
+    в конце.
+
+        guard = ConsistencyGuard()
+        pages = client.tickets.get_tickets_all(guard=guard, order_by="date_created{asc}")
+        print(guard.report.summary())
+
+    Один guard — один прогон: повторное использование начинает новый отчёт.
+    """
+
+    def __init__(self, max_repair_pages: int = 50):
+        self.max_repair_pages = max_repair_pages
+        self.begin()
+
+    def begin(self, params: dict | None = None) -> None:
+        """Сбрасывает состояние перед новым прогоном; params — параметры выборки (для order_by)."""
+        self.report = ConsistencyReport()
+        self._seen = IdBitmap()
+        self._lock = threading.Lock()
+        self._totals: dict[int, int] = {}
+        self._edges: dict[int, tuple] = {}
+        self._total_pages = 0
+        self._order = _window_order((params or {}).get("order_by"))
+        self._requested: set[tuple] = set()
+        self._queue: list[dict] = []
+        self._sweep_left: list[dict] = []
+        self._pass = 0
+
+    # ── Наблюдение за ответами ───────────────────────────────────────────────
+
+    def wrap(self, fetch_func):
+        """Оборачивает fetch_func(**params, page=N), запоминая pagination каждой страницы."""
+
+        def fetch(**params):
+            response = fetch_func(**params)
+            self.observe(params.get("page", 1), response)
+            return response
+
+        return fetch
+
+    def wrap_async(self, fetch_func):
+        async def fetch(**params):
+            response = await fetch_func(**params)
+            self.observe(params.get("page", 1), response)
+            return response
+
+        return fetch
+
+    def observe(self, page: int, response) -> None:
+        if response is None or self._pass:
+            # Повторные запросы (окна, перезагрузка) картину прогона не меняют
+            return
+        try:
+            data = response.json()
+        except Exception:
+            return
+        if not isinstance(data, dict) or "pagination" not in data:
+            return
+        pagination = data["pagination"]
+        items = extract_items(data) if self._order else None
+        with self._lock:
+            total = pagination.get("total")
+            if total is not None:
+                self._totals[page] = total
+                self.report.expected = total
+            self._total_pages = max(self._total_pages, pagination.get("total_pages") or 0)
+            if items:
+                key = self._order[0]
+                self._edges[page] = (items[0].get(key), items[-1].get(key))
+
+    # ── Фильтрация ───────────────────────────────────────────────────────────
+
+    def filter(self, page: list) -> list:
+        """Страница без уже отданных записей."""
+        if not page:
+            return []
+        self.report.received += len(page)
+        fresh = []
+        for item in page:
+            item_id = int(item["id"])
+            if self._seen.add(item_id):
+                fresh.append(item)
+            else:
+                self.report.duplicates[item_id] = self.report.duplicates.get(item_id, 0) + 1
+        self.report.unique = len(self._seen)
+        return fresh
+
+    # ── Добор пропущенного ───────────────────────────────────────────────────
+
+    def next_repair(self) -> list[dict]:
+        """
+        Повторные запросы — параметры поверх исходных ({'page': N} или окно
+        по полю сортировки с 'page'); [] — добирать больше нечего.
+        """
+        if self._pass == 0:
+            self._record_drift()
+            self._pass = 1
+            # Около сдвига перепроверяем всегда: удалённые записи могли «занять»
+            # место пропущенных, и счётчики совпадут
+            if self.report.drift:
+                requests = self._take(
+                    r for page, _, _ in self.report.drift for r in self._seam(page)
+                )
+                if requests:
+                    return requests
+        if self._queue:
+            queue, self._queue = self._queue, []
+            return self._take(queue)
+        if self._pass == 1 and not self.report.consistent:
+            self._pass = 2
+            self._sweep_left = self._sweep()
+        # Общий поиск — порциями, пока записей меньше total
+        while self._sweep_left and not self.report.consistent:
+            batch = self._sweep_left[:_SWEEP_BATCH]
+            self._sweep_left = self._sweep_left[_SWEEP_BATCH:]
+            requests = self._take(batch)
+            if self._budget() == 0:
+                self.report.unchecked += len(self._sweep_left)
+                self._sweep_left = []
+            if requests:
+                return requests
+        return []
+
+    def repair(self, response, request: dict | None = None) -> list:
+        """Новые записи из ответа на повторный запрос request."""
+        if response is None:
+            return []
+        try:
+            data = response.json()
+            items = extract_items(data) or []
+        except Exception as e:
+            print(f"[ConsistencyGuard] Ошибка парсинга: {e}")
+            return []
+        if request is not None and set(request) != {"page"} and isinstance(data, dict):
+            # Окно больше одной страницы — дочитываем его следующим проходом
+            total_pages = (data.get("pagination") or {}).get("total_pages") or 1
+            if request.get("page", 1) < total_pages:
+                self._queue.append({**request, "page": request.get("page", 1) + 1})
+        # Повторно загруженные страницы в received / duplicates не считаются
+        fresh = [item for item in items if self._seen.add(int(item["id"]))]
+        self.report.unique = len(self._seen)
+        self.report.repaired.extend(int(item["id"]) for item in fresh)
+        return fresh
+
+    def finish(self) -> ConsistencyReport:
+        if not self.report.consistent or self.report.unchecked:
+            print(f"[ConsistencyGuard] Выборка неполная: {self.report.summary()}")
+        return self.report
+
+    def _seam(self, page: int) -> list[dict]:
+        """Запросы, перепроверяющие стык страниц page-1 и page."""
+        before, after = self._edges.get(page - 1), self._edges.get(page)
+        if self._order is not None and before and after and before[1] and after[0]:
+            last, first = before[1], after[0]
+            if (first > last) if self._order[1] else (first < last):
+                return []  # страницы перекрылись (вставка) — между ними ничего не пропало
+            return [self._window(last, first)]
+        return [{"page": p} for p in (page - 1, page) if p >= 1]
+
+    def _sweep(self) -> list[dict]:
+        """Все места, где могли потеряться записи, — ближайшие к сдвигам первыми."""
+        drift_pages = [page for page, _, _ in self.report.drift]
+
+        def distance(page: int) -> int:
+            return min((abs(page - d) for d in drift_pages), default=0)
+
+        if self._order is not None and self._edges:
+            pages = sorted(self._edges)
+            first, last = self._edges[pages[0]][0], self._edges[pages[-1]][1]
+            requests = [self._window(None, first), self._window(last, None)]
+            seams = sorted(range(pages[0] + 1, pages[-1] + 1), key=distance)
+            return requests + [r for page in seams for r in self._seam(page)]
+        pages = sorted(range(1, self._total_pages + 1), key=distance)
+        return [{"page": p} for p in pages]
+
+    def _window(self, after_value, before_value) -> dict:
+        """Окно значений поля сортировки от after_value до before_value (в порядке выборки)."""
+        key, descending = self._order
+        low_param, high_param = _WINDOW_FILTERS[key]
+        low, high = (before_value, after_value) if descending else (after_value, before_value)
+        window = {"page": 1}
+        if low is not None:
+            window[low_param] = low
+        if high is not None:
+            window[high_param] = high
+        return window
+
+    def _budget(self) -> int:
+        return max(self.max_repair_pages - len(self._requested), 0)
+
+    def _take(self, requests) -> list[dict]:
+        budget = self._budget()
+        taken = []
+        for request in requests:
+            marker = tuple(sorted(request.items()))
+            if marker in self._requested:
+                continue
+            if len(taken) >= budget:
+                self.report.unchecked += 1
+                continue
+            self._requested.add(marker)
+            taken.append(request)
+        self.report.repair_requests.extend(taken)
+        return taken
+
+    def _record_drift(self) -> None:
+        pages = sorted(self._totals)
+        for prev, page in zip(pages, pages[1:]):
+            if self._totals[prev] != self._totals[page]:
+                self.report.drift.append((page, self._totals[prev], self._totals[page]))
+
+
+def _window_order(order_by) -> tuple[str, bool] | None:
+    """'date_created{desc}' → ('date_created', True); None, если окном не запросить."""
+    if not isinstance(order_by, str):
+        return None
+    name, _, direction = order_by.partition("{")
+    name = name.strip()
+    if name not in _WINDOW_FILTERS:
+        return None
+    return name, direction.rstrip("}").strip().lower() == "desc"
@@ -1,28 +1,351 @@
-import requests
+import asyncio
+import threading
+import time
 from typing import Optional
-class PachkaApi:
+
+import httpx as h
+
+from clients.rate_limiter import RateLimiter
+from clients.retry import RetryPolicy, describe_error
+from clients.transport import TransportConfig
+
+PACHCA_BASE_URL = "https://api.pachca.com/api/shared/v1/"
+MESSAGES_PATH = "messages"
+
+
+def _message_body(chat_id: str | int, text: str, display_name: Optional[str]) -> dict:
+    msg = {"entity_type": "discussion", "entity_id": int(chat_id), "content": text}
+    if display_name:
+        msg["display_name"] = display_name
+    return {"message": msg}
+
+
+def _default_rate_limiter() -> RateLimiter:
+    return RateLimiter(rate=5, initial_concurrency=2, max_concurrency=5)
+
+
+def _default_retry_policy() -> RetryPolicy:
+    # Уведомление лучше отправить дважды, чем потерять: POST повторяется всегда
+    return RetryPolicy(max_attempts=5, retry_methods=frozenset({"POST"}))
+
+
+class _BearerAuth(h.Auth):
     def __init__(self, token: str):
         self.token = token
-        self.base_url = 'https://api.pachka.com'
+
+    def auth_flow(self, request: h.Request):
+        request.headers["Authorization"] = f"Bearer {self.token}"
+        yield request
+
+
+class DigestBuffer:
+    """
+    Очереди сообщений по чатам для дайджестов.
+
+    Сообщения одного чата (и display_name), пришедшие в течение window
+    секунд после первого, склеиваются в одно (или несколько, если текст
+    длиннее max_chars). Порядок внутри чата сохраняется.
+    """
+
+    def __init__(self, window: float, max_chars: int = 4000):
+        self.window = window
+        self.max_chars = max_chars
+        self._queues: dict[tuple, tuple[float, list[str]]] = {}
+
+    def __len__(self) -> int:
+        return sum(len(texts) for _, texts in self._queues.values())
+
+    def add(self, chat_id, text: str, display_name: Optional[str] = None) -> None:
+        key = (chat_id, display_name)
+        if key not in self._queues:
+            self._queues[key] = (time.monotonic(), [])
+        self._queues[key][1].append(text)
+
+    def due_in(self) -> float | None:
+        """Через сколько секунд пора отправлять (0 — уже), None — очереди пусты."""
+        if not self._queues:
+            return None
+        first = min(started for started, _ in self._queues.values())
+        return max(0.0, first + self.window - time.monotonic())
+
+    def take(self, force: bool = False) -> list[tuple]:
+        """Готовые дайджесты: [(chat_id, text, display_name), ...]."""
+        now = time.monotonic()
+        ready = []
+        for key, (started, texts) in list(self._queues.items()):
+            if force or now - started >= self.window:
+                del self._queues[key]
+                chat_id, display_name = key
+                ready.extend((chat_id, text, display_name) for text in self._join(texts))
+        return ready
+
+    def _join(self, texts: list[str]) -> list[str]:
+        chunks, current = [], ""
+        for text in texts:
+            if current and len(current) + 2 + len(text) > self.max_chars:
+                chunks.append(current)
+                current = ""
+            current = f"{current}\n\n{text}" if current else text
+        if current:
+            chunks.append(current)
+        return chunks
+
+
+class PachkaApi:
+    """
+    Синхронный клиент Pachca: пул соединений, лимит частоты, повторы.
+
+        pachka = PachkaApi(TOKEN)
+        pachka.send_message(chat_id, "текст")
+
+    С digest_window > 0 send_message только ставит сообщение в очередь чата;
+    фоновый поток раз в digest_window секунд склеивает накопленное
+    в дайджест — всплеск из 50 уведомлений уходит одним сообщением.
+    Сообщения, которые не удалось отправить после всех повторов, остаются
+    в failed; resend_failed() отправит их ещё раз.
+
+        with PachkaApi(TOKEN, digest_window=10) as pachka:
+            for alert in alerts:
+                pachka.send_message(chat_id, alert)
+
+    Args:
+        token: API-токен Pachca.
+        digest_window: Окно склейки сообщений, секунды (0 — отправлять сразу).
+        max_digest_chars: Максимальная длина одного дайджеста.
+        rate_limiter: RateLimiter (по умолчанию 5 запросов/с).
+        retry_policy: RetryPolicy (по умолчанию повторяет и POST).
+        transport: TransportConfig (по умолчанию — с проверкой TLS).
+    """
+
+    def __init__(
+        self,
+        token: str,
+        digest_window: float = 0.0,
+        max_digest_chars: int = 4000,
+        rate_limiter: RateLimiter | None = None,
+        retry_policy: RetryPolicy | None = None,
+        transport: TransportConfig | None = None,
+    ):
+        self.token = token
+        self.base_url = PACHCA_BASE_URL
+        self.rate_limiter = rate_limiter or _default_rate_limiter()
+        self.retry_policy = retry_policy or _default_retry_policy()
+        self.transport = transport or TransportConfig(verify=True)
+        self.failed: list[tuple] = []
+        self._http = self.transport.build_client(_BearerAuth(token), self.base_url)
+
+        self._digest = DigestBuffer(digest_window, max_digest_chars) if digest_window > 0 else None
+        self._cond = threading.Condition()
+        self._closing = False
+        self._worker: threading.Thread | None = None
 
     def send_message(
         self, chat_id: str, text: str, display_name: Optional[str] = None
     ) -> None:
         """
-        Отправляет сообщение в Pachca чат.
+        Отправляет сообщение в Pachca чат (или ставит в очередь дайджеста).
 
         Args:
             chat_id: ID чата
             text: Текст сообщения
             display_name: Опциональное имя отправителя
         """
-        url = "https://api.pachca.com/api/shared/v1/messages"
-        headers = {"Authorization": f"Bearer {self.token}"}
-        msg = {"entity_type": "discussion", "entity_id": int(chat_id), "content": text}
-        if display_name:
-            msg["display_name"] = display_name
-        try:
-            r = requests.post(url, headers=headers, json={"message": msg}, timeout=30)
-            r.raise_for_status()
-        except requests.RequestException as e:
-            print(f"Error sending message: {e}")
\ No newline at end of file
+        if self._digest is None:
+            self._deliver(chat_id, text, display_name)
+            return
+        with self._cond:
+            self._digest.add(chat_id, text, display_name)
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run_digest, name="pachka-digest", daemon=True
+                )
+                self._worker.start()
+            self._cond.notify()
+
+    def flush(self) -> None:
+        """Отправляет всё, что накопилось в очередях дайджеста."""
+        if self._digest is None:
+            return
+        with self._cond:
+            batch = self._digest.take(force=True)
+        for args in batch:
+            self._deliver(*args)
+
+    def resend_failed(self) -> int:
+        """Повторно отправляет сообщения из failed; возвращает число отправленных."""
+        batch, self.failed = self.failed, []
+        return sum(self._deliver(*args) for args in batch)
+
+    def close(self) -> None:
+        with self._cond:
+            self._closing = True
+            self._cond.notify()
+        if self._worker is not None:
+            self._worker.join()
+        self.flush()
+        self._http.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _run_digest(self) -> None:
+        while True:
+            with self._cond:
+                while not self._closing and (wait := self._digest.due_in()) != 0:
+                    self._cond.wait(timeout=wait)
+                if self._closing:
+                    return
+                batch = self._digest.take()
+            for args in batch:
+                self._deliver(*args)
+
+    def _deliver(self, chat_id, text: str, display_name: Optional[str]) -> bool:
+        body = _message_body(chat_id, text, display_name)
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            self.rate_limiter.acquire()
+            response = None
+            try:
+                response = self._http.post(MESSAGES_PATH, json=body)
+                response.raise_for_status()
+                return True
+            except (h.TransportError, h.HTTPStatusError) as e:
+                delay = self.retry_policy.next_delay("POST", MESSAGES_PATH, attempt, started, e)
+                if delay is None:
+                    print(f"Error sending message: {describe_error(e)}")
+                    self.failed.append((chat_id, text, display_name))
+                    return False
+            finally:
+                self.rate_limiter.release(response)
+            time.sleep(delay)
+
+
+class PachkaApiAsync:
+    """
+    Асинхронный клиент Pachca (см. PachkaApi).
+
+        async with PachkaApiAsync(TOKEN, digest_window=10) as pachka:
+            await pachka.send_message(chat_id, "текст")
+
+    Сообщения одного чата отправляются по порядку, разные чаты — параллельно.
+    """
+
+    def __init__(
+        self,
+        token: str,
+        digest_window: float = 0.0,
+        max_digest_chars: int = 4000,
+        rate_limiter: RateLimiter | None = None,
+        retry_policy: RetryPolicy | None = None,
+        transport: TransportConfig | None = None,
+    ):
+        self.token = token
+        self.base_url = PACHCA_BASE_URL
+        self.rate_limiter = rate_limiter or _default_rate_limiter()
+        self.retry_policy = retry_policy or _default_retry_policy()
+        self.transport = transport or TransportConfig(verify=True)
+        self.failed: list[tuple] = []
+        self._client: Optional[h.AsyncClient] = None
+
+        self._digest = DigestBuffer(digest_window, max_digest_chars) if digest_window > 0 else None
+        self._wake: asyncio.Event | None = None
+        self._flusher: asyncio.Task | None = None
+        self._closing = False
+        self._chat_locks: dict = {}
+
+    async def __aenter__(self):
+        self._client = await self.transport.build_async_client(
+            _BearerAuth(self.token), self.base_url
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+
+    @property
+    def client(self) -> h.AsyncClient:
+        if self._client is None:
+            raise RuntimeError(
+                "Клиент не инициализирован. Используй: async with PachkaApiAsync(...) as pachka"
+            )
+        return self._client
+
+    async def send_message(
+        self, chat_id: str, text: str, display_name: Optional[str] = None
+    ) -> None:
+        """То же, что PachkaApi.send_message."""
+        if self._digest is None:
+            await self._deliver(chat_id, text, display_name)
+            return
+        self._digest.add(chat_id, text, display_name)
+        if self._flusher is None or self._flusher.done():
+            self._wake = asyncio.Event()
+            self._flusher = asyncio.create_task(self._run_digest())
+        self._wake.set()
+
+    async def flush(self) -> None:
+        if self._digest is not None:
+            await self._deliver_all(self._digest.take(force=True))
+
+    async def resend_failed(self) -> int:
+        batch, self.failed = self.failed, []
+        results = await asyncio.gather(*(self._deliver(*args) for args in batch))
+        return sum(results)
+
+    async def aclose(self) -> None:
+        if self._flusher is not None:
+            self._closing = True
+            self._wake.set()
+            await self._flusher
+            self._flusher = None
+        if self._client is not None:
+            await self.flush()
+            await self._client.aclose()
+            self._client = None
+
+    async def _run_digest(self) -> None:
+        while not self._closing:
+            wait = self._digest.due_in()
+            if wait != 0:
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._deliver_all(self._digest.take())
+
+    async def _deliver_all(self, batch: list[tuple]) -> None:
+        await asyncio.gather(*(self._deliver(*args) for args in batch))
+
+    async def _deliver(self, chat_id, text: str, display_name: Optional[str]) -> bool:
+        lock = self._chat_locks.setdefault(chat_id, asyncio.Lock())
+        async with lock:
+            return await self._post(chat_id, text, display_name)
+
+    async def _post(self, chat_id, text: str, display_name: Optional[str]) -> bool:
+        body = _message_body(chat_id, text, display_name)
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            await self.rate_limiter.acquire_async()
+            response = None
+            try:
+                response = await self.client.post(MESSAGES_PATH, json=body)
+                response.raise_for_status()
+                return True
+            except (h.TransportError, h.HTTPStatusError) as e:
+                delay = self.retry_policy.next_delay("POST", MESSAGES_PATH, attempt, started, e)
+                if delay is None:
+                    print(f"Error sending message: {describe_error(e)}")
+                    self.failed.append((chat_id, text, display_name))
+                    return False
+            finally:
+                self.rate_limiter.release(response)
+            await asyncio.sleep(delay)
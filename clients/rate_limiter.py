@@ -0,0 +1,178 @@
+import asyncio
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import httpx as h
+
+
+class RateLimiter:
+    """
+    Ограничитель запросов к HDE: token bucket + адаптивная параллельность (AIMD).
+
+    Один экземпляр можно разделить между несколькими клиентами (sync и async),
+    потоками и задачами — состояние защищено threading.Lock.
+
+        limiter = RateLimiter(rate=5, max_concurrency=20)
+        client = HdeApi(TOKEN, EMAIL, BASE_URL, rate_limiter=limiter)
+        async with HdeApiAsync(TOKEN, EMAIL, BASE_URL, rate_limiter=limiter) as async_client:
+            ...
+
+    Args:
+        rate: Запросов в секунду (None — без ограничения по частоте).
+        burst: Ёмкость корзины токенов (по умолчанию — max(1, rate)).
+        initial_concurrency: Стартовое число одновременных запросов.
+        min_concurrency: Нижняя граница параллельности.
+        max_concurrency: Верхняя граница параллельности.
+        increase_step: Аддитивный прирост лимита за «окно» успешных ответов.
+        decrease_factor: Во сколько раз уменьшать лимит при 429.
+    """
+
+    DEFAULT_RETRY_AFTER = 1.0
+
+    def __init__(
+        self,
+        rate: float | None = None,
+        burst: int | None = None,
+        initial_concurrency: int = 5,
+        min_concurrency: int = 1,
+        max_concurrency: int = 20,
+        increase_step: float = 1.0,
+        decrease_factor: float = 0.5,
+        poll_interval: float = 0.05,
+    ):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1, int(rate or 1))
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.poll_interval = poll_interval
+
+        self._lock = threading.Lock()
+        self._limit = float(min(max(initial_concurrency, min_concurrency), max_concurrency))
+        self._in_flight = 0
+        self._tokens = float(self.burst)
+        self._refilled_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._last_decrease = 0.0
+
+    @property
+    def concurrency(self) -> int:
+        """Текущий лимит одновременных запросов."""
+        return int(self._limit)
+
+    # ── Захват / освобождение ────────────────────────────────────────────────
+
+    def acquire(self) -> None:
+        """Блокирует поток, пока не появится слот и токен."""
+        while True:
+            wait = self._try_acquire()
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        """То же, что acquire(), но не блокирует event loop."""
+        while True:
+            wait = self._try_acquire()
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def release(self, response: h.Response | None = None) -> None:
+        """Освобождает слот и подстраивает лимиты по ответу (если он есть)."""
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+            if response is not None:
+                self._observe(response)
+
+    def _try_acquire(self) -> float:
+        """Пытается занять слот. Возвращает 0 при успехе, иначе — сколько подождать."""
+        with self._lock:
+            now = time.monotonic()
+            if now < self._blocked_until:
+                return self._blocked_until - now
+            if self._in_flight >= int(self._limit):
+                return self.poll_interval
+            if self.rate:
+                self._tokens = min(
+                    float(self.burst), self._tokens + (now - self._refilled_at) * self.rate
+                )
+                self._refilled_at = now
+                if self._tokens < 1:
+                    return (1 - self._tokens) / self.rate
+                self._tokens -= 1
+            self._in_flight += 1
+            return 0.0
+
+    # ── Адаптация по ответам ─────────────────────────────────────────────────
+
+    def is_throttled(self, response: h.Response) -> bool:
+        """429 или 503 с Retry-After — сервер просит притормозить."""
+        if response.status_code == 429:
+            return True
+        return response.status_code == 503 and "Retry-After" in response.headers
+
+    def retry_after(self, response: h.Response) -> float:
+        """Сколько секунд ждать по Retry-After / X-RateLimit-Reset."""
+        delay = parse_retry_after(response.headers.get("Retry-After"))
+        if delay is None:
+            delay = parse_reset(
+                response.headers.get("X-RateLimit-Reset") or response.headers.get("RateLimit-Reset")
+            )
+        return self.DEFAULT_RETRY_AFTER if delay is None else delay
+
+    def _observe(self, response: h.Response) -> None:
+        now = time.monotonic()
+        if self.is_throttled(response):
+            delay = self.retry_after(response)
+            self._blocked_until = max(self._blocked_until, now + delay)
+            # Одно событие перегрузки — одно уменьшение, а не по числу запросов в полёте
+            if now - self._last_decrease >= max(delay, self.DEFAULT_RETRY_AFTER):
+                self._limit = max(float(self.min_concurrency), self._limit * self.decrease_factor)
+                self._last_decrease = now
+            return
+
+        remaining = response.headers.get("X-RateLimit-Remaining") or response.headers.get(
+            "RateLimit-Remaining"
+        )
+        if remaining is not None and remaining.strip().isdigit() and int(remaining) == 0:
+            reset = parse_reset(
+                response.headers.get("X-RateLimit-Reset") or response.headers.get("RateLimit-Reset")
+            )
+            if reset:
+                self._blocked_until = max(self._blocked_until, now + reset)
+
+        if response.status_code < 500:
+            self._limit = min(
+                float(self.max_concurrency), self._limit + self.increase_step / max(self._limit, 1.0)
+            )
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Retry-After: число секунд или HTTP-дата."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_reset(value: str | None) -> float | None:
+    """X-RateLimit-Reset: секунды до сброса или unix-время сброса."""
+    if not value:
+        return None
+    try:
+        reset = float(value.strip())
+    except ValueError:
+        return None
+    if reset > 1_000_000_000:
+        reset -= time.time()
+    return max(0.0, reset)
@@ -0,0 +1,50 @@
+import json
+from typing import Any, Callable
+
+import httpx as h
+
+JsonDecoder = Callable[[bytes], Any]
+
+_UNSET = object()
+
+
+def default_json_decoder() -> JsonDecoder:
+    """Самый быстрый из установленных декодеров: orjson → msgspec → stdlib json."""
+    try:
+        import orjson
+        return orjson.loads
+    except ImportError:
+        pass
+    try:
+        import msgspec
+        return msgspec.json.Decoder().decode
+    except ImportError:
+        return json.loads
+
+
+class HdeResponse:
+    """
+    Обёртка над httpx.Response, которая декодирует тело не больше одного раза.
+
+    json() кэширует результат: повторные вызовы (пагинатор, кэш ответов,
+    инструменты) получают тот же объект — не изменяй его на месте, если ответ
+    может быть нужен кому-то ещё. Остальные атрибуты проксируются в httpx.Response.
+    """
+
+    __slots__ = ("raw", "_decoder", "_json")
+
+    def __init__(self, raw: h.Response, decoder: JsonDecoder = json.loads):
+        self.raw = raw
+        self._decoder = decoder
+        self._json = _UNSET
+
+    def json(self) -> Any:
+        if self._json is _UNSET:
+            self._json = self._decoder(self.raw.content)
+        return self._json
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.raw, name)
+
+    def __repr__(self) -> str:
+        return repr(self.raw)
@@ -0,0 +1,105 @@
+import random
+import re
+import time
+from dataclasses import dataclass, field
+
+import httpx as h
+
+from clients.rate_limiter import parse_retry_after
+
+# Ошибки, при которых запрос гарантированно не дошёл до сервера
+_NOT_SENT_ERRORS = (h.ConnectError, h.ConnectTimeout, h.PoolTimeout)
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Политика повторов для _request: экспоненциальный backoff с jitter.
+
+    GET, PUT и DELETE повторяются автоматически. POST на guarded_post_paths
+    (создание заявки и сообщения) повторяется после неоднозначного сбоя
+    (таймаут чтения, 5xx) только если передан idempotency_guard — функция,
+    которая проверяет, не дошёл ли предыдущий запрос. Остальные POST
+    повторяются только когда запрос точно не был обработан (ошибка
+    подключения, 429).
+
+        client = HdeApi(TOKEN, EMAIL, BASE_URL, retry_policy=RetryPolicy(max_attempts=6))
+
+    Args:
+        max_attempts: Максимум попыток на один вызов (включая первую).
+        backoff_base: Базовая задержка, секунды (растёт как base * 2**n).
+        backoff_max: Потолок задержки, секунды.
+        jitter: Доля случайного разброса задержки (0 — без jitter, 1 — full jitter).
+        max_elapsed: Бюджет времени на один вызов, секунды (None — без ограничения).
+        retry_statuses: HTTP-статусы, после которых имеет смысл повторить.
+        retry_methods: Методы, которые повторяются без дополнительных условий.
+        guarded_post_paths: Регулярные выражения путей POST, повторяемых с guard.
+    """
+
+    max_attempts: int = 4
+    backoff_base: float = 0.5
+    backoff_max: float = 30.0
+    jitter: float = 1.0
+    max_elapsed: float | None = 120.0
+    retry_statuses: frozenset[int] = frozenset({429, 500, 502, 503, 504})
+    retry_methods: frozenset[str] = frozenset({"GET", "PUT", "DELETE"})
+    guarded_post_paths: tuple[str, ...] = (r"tickets/?", r"tickets/\d+/posts/?")
+    _guarded_patterns: list[re.Pattern] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self._guarded_patterns = [re.compile(p) for p in self.guarded_post_paths]
+
+    def next_delay(
+        self,
+        method: str,
+        path: str,
+        attempt: int,
+        started: float,
+        error: Exception,
+        guarded: bool = False,
+    ) -> float | None:
+        """Задержка перед следующей попыткой или None, если повторять нельзя."""
+        if attempt >= self.max_attempts or not self._is_retryable(method, path, error, guarded):
+            return None
+
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1))
+        delay -= delay * self.jitter * random.random()
+        if isinstance(error, h.HTTPStatusError):
+            retry_after = parse_retry_after(error.response.headers.get("Retry-After"))
+            if retry_after is not None:
+                delay = max(delay, retry_after)
+
+        if self.max_elapsed is not None and time.monotonic() - started + delay > self.max_elapsed:
+            return None
+        return delay
+
+    def is_ambiguous(self, method: str, error: Exception) -> bool:
+        """POST мог быть обработан сервером, несмотря на ошибку."""
+        if method != "POST" or isinstance(error, _NOT_SENT_ERRORS):
+            return False
+        return not (isinstance(error, h.HTTPStatusError) and error.response.status_code == 429)
+
+    def _is_retryable(self, method: str, path: str, error: Exception, guarded: bool) -> bool:
+        if isinstance(error, h.HTTPStatusError):
+            status = error.response.status_code
+            if status not in self.retry_statuses:
+                return False
+            if status == 429:
+                return True
+        elif not isinstance(error, h.TransportError):
+            return False
+        elif isinstance(error, _NOT_SENT_ERRORS):
+            return True
+
+        if method in self.retry_methods:
+            return True
+        if method == "POST" and guarded:
+            return any(p.fullmatch(path.lstrip("/")) for p in self._guarded_patterns)
+        return False
+
+
+def describe_error(error: Exception) -> str:
+    """Короткое описание сбоя для логов повторов."""
+    if isinstance(error, h.HTTPStatusError):
+        return f"HTTP {error.response.status_code}"
+    return f"{type(error).__name__}: {error}"
@@ -0,0 +1,173 @@
+import asyncio
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import httpx as h
+
+
+@dataclass
+class TransportConfig:
+    """
+    Настройки HTTP-транспорта для HdeApi / HdeApiAsync.
+
+    С share_pool=True все клиенты, созданные с этим конфигом, используют один
+    пул соединений (отдельно для sync и async). Закрытие клиента общий пул
+    не закрывает — для этого есть close() / aclose() у самого конфига.
+
+        transport = TransportConfig(max_connections=50, http2=True, share_pool=True)
+        client_a = HdeApi(TOKEN_A, EMAIL_A, BASE_URL, transport=transport)
+        client_b = HdeApi(TOKEN_B, EMAIL_B, BASE_URL, transport=transport)
+
+    Args:
+        max_connections: Максимум соединений в пуле.
+        max_keepalive_connections: Сколько простаивающих соединений держать открытыми.
+        keepalive_expiry: Через сколько секунд простоя закрывать соединение.
+        http2: HTTP/2 с мультиплексированием (нужен пакет h2: pip install 'httpx[http2]').
+        connect_timeout: Таймаут установки соединения, секунды.
+        read_timeout: Таймаут чтения ответа, секунды.
+        write_timeout: Таймаут отправки запроса, секунды.
+        pool_timeout: Сколько ждать свободное соединение из пула, секунды.
+        verify: Проверять TLS-сертификат.
+        warmup_connections: Сколько соединений открыть заранее при создании клиента.
+        share_pool: Один пул на все клиенты с этим конфигом.
+    """
+
+    max_connections: int | None = 100
+    max_keepalive_connections: int | None = 20
+    keepalive_expiry: float | None = 5.0
+    http2: bool = False
+    connect_timeout: float | None = 15.0
+    read_timeout: float | None = 15.0
+    write_timeout: float | None = 15.0
+    pool_timeout: float | None = 15.0
+    verify: bool = False
+    warmup_connections: int = 0
+    share_pool: bool = False
+    _sync_pool: h.HTTPTransport | None = field(default=None, init=False, repr=False)
+    _async_pool: h.AsyncHTTPTransport | None = field(default=None, init=False, repr=False)
+
+    @property
+    def limits(self) -> h.Limits:
+        return h.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+    @property
+    def timeout(self) -> h.Timeout:
+        return h.Timeout(
+            connect=self.connect_timeout,
+            read=self.read_timeout,
+            write=self.write_timeout,
+            pool=self.pool_timeout,
+        )
+
+    def _http2_enabled(self) -> bool:
+        # Тихий откат на HTTP/1.1 менял бы и пул, и прогрев — лучше явная ошибка
+        if self.http2 and importlib.util.find_spec("h2") is None:
+            raise ImportError("Для http2=True нужен пакет h2: pip install 'httpx[http2]'")
+        return self.http2
+
+    # ── Сборка клиентов ──────────────────────────────────────────────────────
+
+    def build_client(self, auth: h.Auth, base_url: str) -> h.Client:
+        if self.share_pool:
+            if self._sync_pool is None:
+                self._sync_pool = self._new_transport()
+            transport = _SharedTransport(self._sync_pool)
+        else:
+            transport = self._new_transport()
+        client = h.Client(auth=auth, base_url=base_url, timeout=self.timeout, transport=transport)
+        if self.warmup_connections > 0:
+            self.warmup(client)
+        return client
+
+    async def build_async_client(self, auth: h.Auth, base_url: str) -> h.AsyncClient:
+        if self.share_pool:
+            if self._async_pool is None:
+                self._async_pool = self._new_async_transport()
+            transport = _SharedAsyncTransport(self._async_pool)
+        else:
+            transport = self._new_async_transport()
+        client = h.AsyncClient(
+            auth=auth, base_url=base_url, timeout=self.timeout, transport=transport
+        )
+        if self.warmup_connections > 0:
+            await self.warmup_async(client)
+        return client
+
+    def _new_transport(self) -> h.HTTPTransport:
+        return h.HTTPTransport(verify=self.verify, http2=self._http2_enabled(), limits=self.limits)
+
+    def _new_async_transport(self) -> h.AsyncHTTPTransport:
+        return h.AsyncHTTPTransport(
+            verify=self.verify, http2=self._http2_enabled(), limits=self.limits
+        )
+
+    # ── Прогрев ──────────────────────────────────────────────────────────────
+
+    def _warmup_count(self) -> int:
+        # HTTP/2 мультиплексирует запросы в одном соединении
+        return 1 if self.http2 else self.warmup_connections
+
+    def warmup(self, client: h.Client) -> None:
+        """Открывает warmup_connections соединений параллельными HEAD-запросами."""
+        count = self._warmup_count()
+        with ThreadPoolExecutor(max_workers=count) as executor:
+            list(executor.map(lambda _: _head_quietly(client), range(count)))
+
+    async def warmup_async(self, client: h.AsyncClient) -> None:
+        count = self._warmup_count()
+        await asyncio.gather(*(_ahead_quietly(client) for _ in range(count)))
+
+    # ── Закрытие общего пула ─────────────────────────────────────────────────
+
+    def close(self) -> None:
+        if self._sync_pool is not None:
+            self._sync_pool.close()
+            self._sync_pool = None
+
+    async def aclose(self) -> None:
+        if self._async_pool is not None:
+            await self._async_pool.aclose()
+            self._async_pool = None
+
+
+def _head_quietly(client: h.Client) -> None:
+    try:
+        client.head("")
+    except h.HTTPError as e:
+        print(f"[TransportConfig] Прогрев соединения не удался: {e!r}")
+
+
+async def _ahead_quietly(client: h.AsyncClient) -> None:
+    try:
+        await client.head("")
+    except h.HTTPError as e:
+        print(f"[TransportConfig] Прогрев соединения не удался: {e!r}")
+
+
+class _SharedTransport(h.BaseTransport):
+    """Обёртка над общим пулом: клиент не закрывает его при close()."""
+
+    def __init__(self, pool: h.HTTPTransport):
+        self._pool = pool
+
+    def handle_request(self, request: h.Request) -> h.Response:
+        return self._pool.handle_request(request)
+
+    def close(self) -> None:
+        pass
+
+
+class _SharedAsyncTransport(h.AsyncBaseTransport):
+    def __init__(self, pool: h.AsyncHTTPTransport):
+        self._pool = pool
+
+    async def handle_async_request(self, request: h.Request) -> h.Response:
+        return await self._pool.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        pass
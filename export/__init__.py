@@ -0,0 +1,3 @@
+from export.columns import ColumnSink, Categorical, collect_columns, TICKET_SCHEMA, USER_SCHEMA
+from export.excel import ExcelExporter, Column, USER_COLUMNS, TICKET_COLUMNS
+from export.checkpoint import Checkpoint, JsonlWriter, CsvWriter, read_jsonl_pages
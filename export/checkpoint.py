@@ -0,0 +1,253 @@
+import csv
+import json
+import os
+from typing import Any
+
+from utils import serialise_params
+
+
+class Checkpoint:
+    """
+    Файл состояния для возобновляемой пагинации.
+
+    Хранит параметры запроса, число обработанных страниц, ID записей последней
+    страницы (для дедупликации на стыке) и позицию в выходном файле.
+    Страница считается обработанной, когда потребитель запросил следующую.
+
+        checkpoint = Checkpoint("tickets_export.ckpt")
+        with JsonlWriter("tickets.jsonl", checkpoint) as out:
+            for page in client.tickets.get_tickets_lazy(checkpoint=checkpoint):
+                out.write_page(page)
+
+    После падения тот же код продолжит со следующей страницы. При других
+    параметрах запроса состояние сбрасывается. done=True ставится, только
+    если пагинатор дошёл до последней страницы; если запрос страницы так
+    и не удался, состояние остаётся незавершённым и следующий запуск
+    продолжит с неё. После done=True повторный запуск начнёт заново.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.params: dict[str, Any] | None = None
+        self.completed_pages = 0
+        self.boundary_ids: list[int] = []
+        self.position: int | None = None
+        self.done = False
+        self._reached_end = False
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                raw = json.load(f)
+            self.params = raw.get("params")
+            self.completed_pages = raw.get("completed_pages", 0)
+            self.boundary_ids = raw.get("boundary_ids", [])
+            self.position = raw.get("position")
+            self.done = raw.get("done", False)
+
+    @property
+    def next_page(self) -> int:
+        return self.completed_pages + 1
+
+    @property
+    def resumed(self) -> bool:
+        """Есть незавершённый прогон, который продолжаем."""
+        return self.completed_pages > 0 and not self.done
+
+    def bind(self, params: dict) -> int:
+        """Привязывает состояние к параметрам запроса и возвращает стартовую страницу."""
+        normalized = json.loads(json.dumps(serialise_params(params), default=str))
+        normalized.pop("page", None)
+        if self.done or (self.params is not None and self.params != normalized):
+            if self.params is not None and not self.done:
+                print(f"[Checkpoint] Параметры запроса изменились, {self.path} сброшен")
+            self.reset()
+        self.params = normalized
+        self._reached_end = False
+        return self.next_page
+
+    def reset(self) -> None:
+        self.completed_pages = 0
+        self.boundary_ids = []
+        self.position = None
+        self.done = False
+
+    def dedupe(self, page: list) -> list:
+        """Убирает записи, уже полученные на последней обработанной странице."""
+        if not self.boundary_ids:
+            return page
+        seen = set(self.boundary_ids)
+        return [r for r in page if _record_id(r) not in seen]
+
+    def commit(self, page_number: int, page: list) -> None:
+        self.completed_pages = page_number
+        self.boundary_ids = [i for i in map(_record_id, page) if i is not None]
+        self.save()
+
+    def mark_end(self) -> None:
+        """Пагинатор дошёл до последней страницы (см. _paginate_lazy(on_end=...))."""
+        self._reached_end = True
+
+    def finish(self) -> None:
+        self.done = True
+        self.save()
+
+    def _stop(self) -> None:
+        if self._reached_end:
+            self.finish()
+        else:
+            print(
+                f"[Checkpoint] Выгрузка прервана после страницы {self.completed_pages}, "
+                f"продолжение — с {self.next_page} ({self.path})"
+            )
+
+    def save(self) -> None:
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "params": self.params,
+                    "completed_pages": self.completed_pages,
+                    "boundary_ids": self.boundary_ids,
+                    "position": self.position,
+                    "done": self.done,
+                },
+                f,
+            )
+        os.replace(tmp, self.path)
+
+    # ── Обёртки над пагинаторами ─────────────────────────────────────────────
+
+    def track(self, pages):
+        """Генератор: дедуплицирует стык и отмечает страницу после её обработки."""
+        try:
+            for page in pages:
+                page_number = self.next_page
+                fresh = self.dedupe(page)
+                if fresh:
+                    yield fresh
+                self.commit(page_number, page)
+            self._stop()
+        finally:
+            pages.close()
+
+    async def track_async(self, pages):
+        try:
+            async for page in pages:
+                page_number = self.next_page
+                fresh = self.dedupe(page)
+                if fresh:
+                    yield fresh
+                self.commit(page_number, page)
+            self._stop()
+        finally:
+            await pages.aclose()
+
+
+def _record_id(record) -> int | None:
+    value = record.get("id")
+    return int(value) if value is not None else None
+
+
+# ─── Возобновляемые writers ──────────────────────────────────────────────────
+
+class _ResumableWriter:
+    """
+    Файл, который при возобновлении обрезается до позиции из checkpoint.
+
+    Так строки страницы, записанной, но не отмеченной в checkpoint до падения,
+    не задваиваются. Параметры запроса checkpoint сверяет позже, на первом
+    шаге пагинатора (bind); если он при этом сбросился, первая write_page()
+    начинает файл заново.
+    """
+
+    def __init__(self, path: str, checkpoint: Checkpoint | None = None):
+        self.path = path
+        self.checkpoint = checkpoint
+        resume = (
+            checkpoint is not None
+            and checkpoint.resumed
+            and checkpoint.position is not None
+            and os.path.exists(path)
+        )
+        if resume:
+            self._file = open(path, "r+", encoding="utf-8", newline="")
+            self._file.seek(checkpoint.position)
+            self._file.truncate()
+        else:
+            self._file = open(path, "w", encoding="utf-8", newline="")
+        self.fresh = not resume
+        self._verify_resume = resume
+
+    def _before_write(self) -> None:
+        if not self._verify_resume:
+            return
+        self._verify_resume = False
+        if self.checkpoint.completed_pages == 0:
+            # bind() сбросил checkpoint (другие параметры) — старые строки не наши
+            self._file.seek(0)
+            self._file.truncate()
+            self._restarted()
+
+    def _restarted(self) -> None:
+        """Файл начат заново после сброса checkpoint."""
+
+    def _flushed(self) -> None:
+        self._file.flush()
+        if self.checkpoint is not None:
+            self.checkpoint.position = self._file.tell()
+
+    def close(self) -> None:
+        self._before_write()  # сброс без единой страницы тоже не должен оставить старые строки
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class JsonlWriter(_ResumableWriter):
+    """Одна запись — одна строка JSON."""
+
+    def write_page(self, page: list) -> None:
+        self._before_write()
+        for record in page:
+            data = record.to_dict() if hasattr(record, "to_dict") else record
+            self._file.write(json.dumps(data, ensure_ascii=False))
+            self._file.write("\n")
+        self._flushed()
+
+
+class CsvWriter(_ResumableWriter):
+    """CSV с заданными колонками (ключами записи)."""
+
+    def __init__(self, path: str, columns: list[str], checkpoint: Checkpoint | None = None):
+        super().__init__(path, checkpoint)
+        self.columns = columns
+        self._writer = csv.writer(self._file)
+        if self.fresh:
+            self._restarted()
+
+    def _restarted(self) -> None:
+        self._writer.writerow(self.columns)
+        self._flushed()
+
+    def write_page(self, page: list) -> None:
+        self._before_write()
+        for record in page:
+            self._writer.writerow([record.get(c, "") for c in self.columns])
+        self._flushed()
+
+
+def read_jsonl_pages(path: str, page_size: int = 100):
+    """Читает JSONL страницами — например, чтобы выгрузить накопленный файл в Excel."""
+    page = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                page.append(json.loads(line))
+            if len(page) >= page_size:
+                yield page
+                page = []
+    if page:
+        yield page
@@ -0,0 +1,207 @@
+from array import array
+from typing import Any, NamedTuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+INT = "int"
+CATEGORY = "category"
+STR = "str"
+
+TICKET_SCHEMA = {
+    "id": INT,
+    "pid": INT,
+    "department_id": INT,
+    "owner_id": INT,
+    "user_id": INT,
+    "priority_id": INT,
+    "type_id": INT,
+    "sla_flag": INT,
+    "freeze": INT,
+    "deleted": INT,
+    "status_id": CATEGORY,
+    "department_name": CATEGORY,
+    "source": CATEGORY,
+    "rate": CATEGORY,
+    "date_created": STR,
+    "date_updated": STR,
+    "sla_date": STR,
+    "title": STR,
+}
+
+USER_SCHEMA = {
+    "id": INT,
+    "status": CATEGORY,
+    "language": CATEGORY,
+    "user_status": CATEGORY,
+    "name": STR,
+    "lastname": STR,
+    "email": STR,
+    "date_created": STR,
+    "date_updated": STR,
+}
+
+
+class Categorical(NamedTuple):
+    """Словарное кодирование: codes[i] — индекс в categories, -1 — пусто."""
+    codes: Any
+    categories: list[str]
+
+
+class _IntColumn:
+    def __init__(self):
+        self.values = array("q")
+        self.valid = bytearray()
+
+    def append(self, value: Any) -> None:
+        try:
+            self.values.append(int(value))
+            self.valid.append(1)
+        except (TypeError, ValueError):
+            self.values.append(0)
+            self.valid.append(0)
+
+
+class _CategoryColumn:
+    def __init__(self):
+        self.codes = array("i")
+        self.index: dict[str, int] = {}
+        self.categories: list[str] = []
+
+    def append(self, value: Any) -> None:
+        if value is None or value == "":
+            self.codes.append(-1)
+            return
+        value = str(value)
+        code = self.index.get(value)
+        if code is None:
+            code = self.index[value] = len(self.categories)
+            self.categories.append(value)
+        self.codes.append(code)
+
+
+class _StrColumn:
+    def __init__(self):
+        self.values: list[str | None] = []
+
+    def append(self, value: Any) -> None:
+        self.values.append(None if value is None else str(value))
+
+
+_COLUMN_TYPES = {INT: _IntColumn, CATEGORY: _CategoryColumn, STR: _StrColumn}
+
+
+class ColumnSink:
+    """
+    Колоночный приёмник страниц из get_*_lazy().
+
+    Каждая страница сразу раскладывается по колонкам: целые — в array('q'),
+    низкокардинальные строки — словарным кодированием, прочее — списками.
+    Сами словари страниц не хранятся.
+
+        cols = collect_columns(client, client.tickets.get_tickets_lazy())
+        cols = await collect_columns(async_client, async_client.tickets.get_tickets_lazy())
+        cols.to_columns()          # NumPy, если установлен
+        cols.write_parquet("tickets.parquet")  # нужен pyarrow
+
+    Args:
+        schema: Колонка → тип (INT / CATEGORY / STR), по умолчанию TICKET_SCHEMA.
+    """
+
+    def __init__(self, schema: dict[str, str] | None = None):
+        self.schema = schema or TICKET_SCHEMA
+        self._columns = {name: _COLUMN_TYPES[kind]() for name, kind in self.schema.items()}
+        self.rows = 0
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def feed(self, page: list) -> None:
+        columns = self._columns.items()
+        for record in page:
+            for name, column in columns:
+                column.append(record.get(name))
+        self.rows += len(page)
+
+    def finish(self) -> "ColumnSink":
+        return self
+
+    # ── Выгрузка ─────────────────────────────────────────────────────────────
+
+    def to_columns(self) -> dict[str, Any]:
+        """
+        Колонки как массивы.
+
+        INT — numpy.ndarray int64 (numpy.ma.MaskedArray, если есть пропуски)
+        или array('q') без NumPy; CATEGORY — Categorical; STR — list.
+        """
+        result: dict[str, Any] = {}
+        for name, column in self._columns.items():
+            if isinstance(column, _IntColumn):
+                result[name] = _int_array(column)
+            elif isinstance(column, _CategoryColumn):
+                codes = np.array(column.codes, dtype=np.int32) if np is not None else column.codes
+                result[name] = Categorical(codes, list(column.categories))
+            else:
+                result[name] = column.values
+        return result
+
+    def to_arrow(self):
+        """pyarrow.Table; категориальные колонки — DictionaryArray."""
+        _require_pyarrow()
+        arrays, names = [], []
+        for name, column in self._columns.items():
+            if isinstance(column, _IntColumn):
+                mask = [not v for v in column.valid] if 0 in column.valid else None
+                arrays.append(pa.array(column.values, type=pa.int64(), mask=mask))
+            elif isinstance(column, _CategoryColumn):
+                indices = pa.array(column.codes, type=pa.int32(), mask=[c < 0 for c in column.codes])
+                arrays.append(
+                    pa.DictionaryArray.from_arrays(indices, pa.array(column.categories, pa.string()))
+                )
+            else:
+                arrays.append(pa.array(column.values, type=pa.string()))
+            names.append(name)
+        return pa.Table.from_arrays(arrays, names=names)
+
+    def write_parquet(self, path: str, **kwargs) -> None:
+        _require_pyarrow()
+        import pyarrow.parquet as pq
+        pq.write_table(self.to_arrow(), path, **kwargs)
+
+    def write_feather(self, path: str, **kwargs) -> None:
+        _require_pyarrow()
+        import pyarrow.feather as feather
+        feather.write_feather(self.to_arrow(), path, **kwargs)
+
+
+def collect_columns(api, pages, schema: dict[str, str] | None = None):
+    """
+    Собирает страницы в ColumnSink.
+
+    Sync:  cols = collect_columns(client, client.users.get_users_lazy(), USER_SCHEMA)
+    Async: cols = await collect_columns(async_client, async_client.users.get_users_lazy(), USER_SCHEMA)
+    """
+    return api._consume_pages(pages, ColumnSink(schema))
+
+
+def _int_array(column: _IntColumn):
+    if np is None:
+        return column.values
+    values = np.array(column.values, dtype=np.int64)
+    if 0 in column.valid:
+        mask = np.frombuffer(bytes(column.valid), dtype=np.uint8) == 0
+        return np.ma.MaskedArray(values, mask=mask)
+    return values
+
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise ImportError("Для to_arrow / Parquet / Feather нужен pyarrow: pip install pyarrow")
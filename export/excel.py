@@ -0,0 +1,184 @@
+import asyncio
+import queue
+import threading
+from dataclasses import dataclass
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill
+from openpyxl.utils import get_column_letter
+
+
+@dataclass(frozen=True)
+class Column:
+    """Колонка выгрузки: заголовок, ключ записи и ширина."""
+    header: str
+    key: str
+    width: float = 15
+
+
+USER_COLUMNS = [
+    Column("ID", "id", 10),
+    Column("Email", "email", 35),
+]
+
+TICKET_COLUMNS = [
+    Column("ID", "id", 10),
+    Column("Тема", "title", 50),
+    Column("Статус", "status_id", 15),
+    Column("Отдел", "department_name", 25),
+    Column("Исполнитель", "owner_email", 30),
+    Column("Клиент", "user_email", 30),
+    Column("Создана", "date_created", 20),
+    Column("Обновлена", "date_updated", 20),
+]
+
+_HEADER_FONT = Font(bold=True, size=12)
+_HEADER_FILL = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
+_DONE = object()
+
+
+class ExcelExporter:
+    """
+    Потоковая выгрузка страниц в .xlsx с постоянным расходом памяти.
+
+    Книга открывается в write-only режиме, строки пишутся сразу. Страницы
+    загружаются отдельно (поток или задача) и передаются через очередь
+    на queue_size страниц, поэтому следующие страницы качаются, пока
+    пишутся текущие.
+
+        exporter = ExcelExporter("users.xlsx", USER_COLUMNS, sheet_title="Пользователи")
+        total = exporter.export(client.users.get_users_lazy())
+        total = await exporter.export_async(async_client.tickets.get_tickets_lazy())
+
+    Args:
+        filename: Путь к файлу .xlsx.
+        columns: Колонки (Column) — заголовок, ключ, ширина.
+        sheet_title: Название листа.
+        queue_size: Сколько загруженных страниц может ждать записи.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        columns: list[Column],
+        sheet_title: str = "Выгрузка",
+        queue_size: int = 4,
+    ):
+        self.filename = filename
+        self.columns = columns
+        self.sheet_title = sheet_title
+        self.queue_size = queue_size
+
+    def _open(self):
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet(self.sheet_title)
+        for i, column in enumerate(self.columns, start=1):
+            ws.column_dimensions[get_column_letter(i)].width = column.width
+        header = []
+        for column in self.columns:
+            cell = WriteOnlyCell(ws, value=column.header)
+            cell.font = _HEADER_FONT
+            cell.fill = _HEADER_FILL
+            header.append(cell)
+        ws.append(header)
+        return wb, ws
+
+    def _write_page(self, ws, page: list) -> int:
+        keys = [c.key for c in self.columns]
+        for record in page:
+            ws.append([_cell_value(record.get(k, "")) for k in keys])
+        return len(page)
+
+    # ── Sync ─────────────────────────────────────────────────────────────────
+
+    def export(self, pages) -> int:
+        """Выгружает страницы из синхронного пагинатора. Возвращает число строк."""
+        wb, ws = self._open()
+        pipe: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+
+        def produce():
+            try:
+                for page in pages:
+                    while not stop.is_set():
+                        try:
+                            pipe.put(page, timeout=0.1)
+                            break
+                        except queue.Full:
+                            continue
+                    if stop.is_set():
+                        break
+            except Exception as e:
+                pipe.put(e)
+            finally:
+                close = getattr(pages, "close", None)
+                if close is not None:
+                    close()
+                pipe.put(_DONE)
+
+        producer = threading.Thread(target=produce, name="hde-export", daemon=True)
+        producer.start()
+        total = 0
+        try:
+            while True:
+                item = pipe.get()
+                if item is _DONE:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                total += self._write_page(ws, item)
+        finally:
+            stop.set()
+            while producer.is_alive():
+                try:
+                    pipe.get_nowait()
+                except queue.Empty:
+                    producer.join(0.1)
+
+        wb.save(self.filename)
+        return total
+
+    # ── Async ────────────────────────────────────────────────────────────────
+
+    async def export_async(self, pages) -> int:
+        """Выгружает страницы из async-пагинатора. Возвращает число строк."""
+        wb, ws = self._open()
+        pipe: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+
+        async def produce():
+            try:
+                async for page in pages:
+                    await pipe.put(page)
+            except Exception as e:
+                await pipe.put(e)
+                return
+            finally:
+                aclose = getattr(pages, "aclose", None)
+                if aclose is not None:
+                    await aclose()
+            await pipe.put(_DONE)
+
+        producer = asyncio.ensure_future(produce())
+        total = 0
+        try:
+            while True:
+                item = await pipe.get()
+                if item is _DONE:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                total += self._write_page(ws, item)
+        finally:
+            if not producer.done():
+                producer.cancel()
+                await asyncio.gather(producer, return_exceptions=True)
+
+        await asyncio.to_thread(wb.save, self.filename)
+        return total
+
+
+def _cell_value(value):
+    if isinstance(value, (list, dict)):
+        return ", ".join(map(str, value)) if isinstance(value, list) else str(value)
+    return value
@@ -1 +1 @@
-from messages.messages import Messages
+from messages.messages import Messages, PostResult, content_hash
@@ -1,11 +1,49 @@
+import hashlib
+from dataclasses import dataclass
+from typing import Any, Iterable
+
+from clients.batch import records_from
+from clients.bulk import NO_RESPONSE, LaneBlocked
 from models import CreateMessageProto
 
+_DUPLICATE = object()
+
+
+def content_hash(ticket_id: int, message: CreateMessageProto) -> str:
+    """Хэш сообщения для дедупликации: заявка + текст + автор."""
+    raw = f"{int(ticket_id)}\0{message.get('text', '')}\0{message.get('user_id') or ''}"
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+@dataclass
+class PostResult:
+    """
+    Исход одного сообщения из Messages.post_many.
+
+    status: 'sent' — отправлено, 'duplicate' — такое уже отправлялось,
+    'failed' — ошибка, 'blocked' — не отправлено, т.к. предыдущее сообщение
+    этой заявки не прошло (порядок внутри заявки сохраняется).
+    """
+
+    index: int
+    ticket_id: int
+    content_hash: str
+    status: str
+    post: dict[str, Any] | None = None
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status in ("sent", "duplicate")
+
 
 class Messages:
     def __init__(self, api):
         self._api = api
 
-    def create_message(self, message: CreateMessageProto, ticket_id: int):
+    def create_message(
+        self, message: CreateMessageProto, ticket_id: int, idempotency_guard=None
+    ):
         """
         Создать сообщение в тикете.
 
@@ -15,5 +53,71 @@ class Messages:
         Args:
             message: Словарь с текстом сообщения {'text': '...', 'user_id': int | None}.
             ticket_id: ID тикета.
+            idempotency_guard: Проверка «сообщение уже отправлено?» перед повтором
+                               после таймаута / 5xx. Без неё POST не повторяется.
+        """
+        return self._api._request(
+            "POST", f"tickets/{ticket_id}/posts/", data=message, idempotency_guard=idempotency_guard
+        )
+
+    def post_many(
+        self,
+        posts: Iterable[tuple[int, CreateMessageProto]],
+        max_concurrent: int | None = None,
+        sent_hashes: set[str] | None = None,
+    ):
+        """
+        Отправить много сообщений: заявки параллельно, внутри заявки — по порядку.
+
+        Результаты (PostResult) отдаются по мере готовности, не в порядке входа.
+        Повтор того же текста в ту же заявку не отправляется (status='duplicate'):
+        и внутри прогона, и по sent_hashes — хэшам прошлых прогонов. Хэши
+        успешно отправленных сообщений добавляются в sent_hashes, его можно
+        сохранить и передать в следующий раз.
+
+        Sync:  for result in client.messages.post_many(posts): save(result)
+        Async: async for result in async_client.messages.post_many(posts): ...
+
+        Args:
+            posts: Пары (ticket_id, {'text': '...', 'user_id': ...}); читаются по мере отправки.
+            max_concurrent: Максимум одновременных запросов (по умолчанию —
+                            rate_limiter.max_concurrency клиента).
+            sent_hashes: Множество content_hash уже отправленных сообщений.
         """
-        return self._api._request("POST", f"tickets/{ticket_id}/posts/", data=message)
+        seen = set(sent_hashes or ())
+
+        def items():
+            for index, (ticket_id, message) in enumerate(posts):
+                ticket_id = int(ticket_id)
+                digest = content_hash(ticket_id, message)
+                duplicate = digest in seen
+                seen.add(digest)
+                yield ticket_id, (index, ticket_id, digest), None if duplicate else message
+
+        def call(ticket_id, message):
+            if message is None:
+                return _DUPLICATE
+            return self.create_message(message, ticket_id)
+
+        def convert(key, outcome) -> PostResult:
+            index, ticket_id, digest = key
+            result = PostResult(index, ticket_id, digest, "sent")
+            if outcome is _DUPLICATE:
+                result.status = "duplicate"
+            elif isinstance(outcome, LaneBlocked):
+                result.status = "blocked"
+                result.error = LaneBlocked.__doc__
+            elif isinstance(outcome, BaseException):
+                result.status = "failed"
+                result.error = f"{type(outcome).__name__}: {outcome}"
+            elif outcome is None:
+                result.status = "failed"
+                result.error = NO_RESPONSE
+            else:
+                records = records_from(outcome) if outcome.content else []
+                result.post = records[0] if records else None
+                if sent_hashes is not None:
+                    sent_hashes.add(digest)
+            return result
+
+        return self._api._stream_lanes(items(), call, convert, max_concurrent=max_concurrent)
@@ -17,4 +17,5 @@ from models.models import (
     UpdateUserParams,
     UserGroupData,
     UserData,
-)
\ No newline at end of file
+)
+from models.records import TicketRecord, UserRecord, to_records
@@ -0,0 +1,165 @@
+import json
+import sys
+from typing import Any, Iterable
+
+from models.models import TicketData, UserData
+
+try:
+    from orjson import loads as _loads
+except ImportError:
+    from json import loads as _loads
+
+
+_MISSING = object()
+
+
+def _dumps(value: Any) -> bytes:
+    # stdlib, а не orjson: orjson отдаёт bytes с запасом ёмкости ~1 КБ на объект
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class _Record:
+    """
+    Компактная запись со __slots__ вместо dict на ~37 ключей.
+
+    Тяжёлые поля (_heavy) хранятся сжатым JSON и декодируются при обращении;
+    значения низкой кардинальности (_interned) интернируются. Поддерживает
+    record['id'] и record.get('email'), поэтому подходит коду, написанному
+    под dict. to_dict() возвращает обычный словарь.
+
+    Поля, которых не было в исходных данных, не заполняются: record['x']
+    для них — KeyError, record.get('x', d) — d, в to_dict() их нет.
+    Атрибут record.x для известного поля в этом случае равен None.
+    """
+
+    __slots__ = ()
+    _fields: tuple[str, ...] = ()
+    _field_set: frozenset[str] = frozenset()
+    _heavy: frozenset[str] = frozenset()
+    _interned: frozenset[str] = frozenset()
+
+    def __init__(self, data: dict[str, Any]):
+        extra = None
+        for key in self._fields:
+            value = data.get(key, _MISSING)
+            if value is _MISSING:
+                continue
+            if key in self._heavy:
+                object.__setattr__(self, f"_{key}", _dumps(value) if value else value)
+            else:
+                if key in self._interned and isinstance(value, str):
+                    value = sys.intern(value)
+                object.__setattr__(self, key, value)
+        for key, value in data.items():
+            if key not in self._field_set:
+                extra = extra or {}
+                extra[key] = value
+        object.__setattr__(self, "_extra", extra)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]):
+        return cls(data)
+
+    @classmethod
+    def from_response(cls, response):
+        """Запись из ответа «по id» (data: {...}) или None."""
+        if response is None:
+            return None
+        payload = response.json()
+        data = payload.get("data") if isinstance(payload, dict) else None
+        return cls(data) if isinstance(data, dict) else None
+
+    def _lookup(self, key: str) -> Any:
+        """Значение поля или _MISSING, если его не было в исходных данных."""
+        try:
+            if key in self._heavy:
+                raw = object.__getattribute__(self, f"_{key}")
+                return _loads(raw) if isinstance(raw, bytes) else raw
+            if key in self._field_set:
+                return object.__getattribute__(self, key)
+        except AttributeError:
+            return _MISSING
+        extra = object.__getattribute__(self, "_extra")
+        if extra and key in extra:
+            return extra[key]
+        return _MISSING
+
+    def __getattr__(self, name: str) -> Any:
+        # Вызывается для имён не из слотов (тяжёлые поля, extra) и для незаполненных слотов
+        value = self._lookup(name)
+        if value is not _MISSING:
+            return value
+        if name in self._field_set:
+            return None
+        raise AttributeError(name)
+
+    def __getitem__(self, key: str) -> Any:
+        value = self._lookup(key)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: str) -> bool:
+        return self._lookup(key) is not _MISSING
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self._lookup(key)
+        return default if value is _MISSING else value
+
+    def to_dict(self) -> dict[str, Any]:
+        data = {}
+        for key in self._fields:
+            value = self._lookup(key)
+            if value is not _MISSING:
+                data[key] = value
+        if self._extra:
+            data.update(self._extra)
+        return data
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, _Record):
+            return NotImplemented
+        return type(self) is type(other) and self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(id={getattr(self, 'id', None)!r})"
+
+
+def _slots(fields: Iterable[str], heavy: frozenset[str]) -> tuple[str, ...]:
+    return tuple(f"_{f}" if f in heavy else f for f in fields) + ("_extra",)
+
+
+_TICKET_FIELDS = tuple(TicketData.__annotations__)
+_TICKET_HEAVY = frozenset({"custom_fields", "cc", "bcc", "jira_issues", "followers", "tags"})
+
+
+class TicketRecord(_Record):
+    """Заявка (TicketData) в виде компактной записи."""
+
+    __slots__ = _slots(_TICKET_FIELDS, _TICKET_HEAVY)
+    _fields = _TICKET_FIELDS
+    _field_set = frozenset(_TICKET_FIELDS)
+    _heavy = _TICKET_HEAVY
+    _interned = frozenset({
+        "source", "status_id", "department_name", "owner_name", "owner_lastname",
+        "owner_email", "rate",
+    })
+
+
+_USER_FIELDS = tuple(UserData.__annotations__)
+_USER_HEAVY = frozenset({"custom_fields", "group", "department", "organization"})
+
+
+class UserRecord(_Record):
+    """Пользователь (UserData) в виде компактной записи."""
+
+    __slots__ = _slots(_USER_FIELDS, _USER_HEAVY)
+    _fields = _USER_FIELDS
+    _field_set = frozenset(_USER_FIELDS)
+    _heavy = _USER_HEAVY
+    _interned = frozenset({"status", "language", "user_status"})
+
+
+def to_records(page: list[dict[str, Any]], record_cls: type[_Record]) -> list:
+    """Страница словарей → список записей record_cls."""
+    return [record_cls(item) for item in page]
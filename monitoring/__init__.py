@@ -0,0 +1 @@
+from monitoring.sla_monitor import Alert, SlaMonitor
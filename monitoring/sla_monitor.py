@@ -0,0 +1,242 @@
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from config import main_b2c_departments, monitoring_chat_id
+from models import TicketData, TicketStatus
+from tickets import TicketSyncState
+
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+SLA_FORMAT = "%d.%m.%Y %H:%M"
+
+SLA_SOON = "sla_soon"
+SLA_BREACHED = "sla_breached"
+STALE = "stale"
+
+_TITLES = {
+    SLA_SOON: "Скоро истекает SLA",
+    SLA_BREACHED: "Просрочен SLA",
+    STALE: "Заявки без движения",
+}
+
+
+class _Watch:
+    """То, что монитор помнит о заявке между циклами."""
+
+    __slots__ = ("id", "unique_id", "title", "status", "owner", "sla", "updated")
+
+    def __init__(self, ticket: TicketData):
+        self.id = int(ticket["id"])
+        self.unique_id = ticket.get("unique_id") or self.id
+        self.title = ticket.get("title") or ""
+        self.status = _status(ticket.get("status_id"))
+        owner = " ".join(p for p in (ticket.get("owner_name"), ticket.get("owner_lastname")) if p)
+        self.owner = owner or "без исполнителя"
+        self.sla = _parse(ticket.get("sla_date"))
+        self.updated = _parse(ticket.get("date_updated"))
+
+
+@dataclass
+class Alert:
+    kind: str
+    ticket_id: int
+    text: str
+    fingerprint: str
+
+
+class SlaMonitor:
+    """
+    Мониторинг SLA заявок с уведомлениями в Pachca.
+
+    Первый цикл загружает открытые заявки отделов departments, дальше
+    каждый цикл через sync_tickets() получает только изменённые с прошлого
+    раза (watermark по date_updated), так что число запросов зависит от
+    числа изменений, а не от размера очереди. Изменения запрашиваются без
+    фильтра по отделу и статусу: заявка, переведённая в другой отдел или
+    закрытая, тоже приходит и убирается из наблюдения. Удалённые заявки
+    догружаются вторым запросом (deleted=1) со своим watermark.
+    Проверки идут по состоянию в памяти:
+
+    - SLA наступит в ближайшие sla_warning секунд;
+    - SLA уже просрочен;
+    - заявка в stale_statuses не менялась дольше stale_after секунд.
+
+    Одно уведомление на (заявку, вид) и его «отпечаток» (например, sla_date);
+    повтор — не раньше cooldown секунд. Уведомления за цикл собираются
+    в одно сообщение на вид.
+
+        monitor = SlaMonitor(client, PachkaApi(TOKEN), state_path="sla_monitor.json")
+        monitor.run(interval=60)
+    """
+
+    def __init__(
+        self,
+        api,
+        notifier,
+        chat_id: int | str = monitoring_chat_id,
+        departments: list[int] = main_b2c_departments,
+        sla_warning: float = 3600.0,
+        stale_after: float = 4 * 3600.0,
+        cooldown: float | None = 4 * 3600.0,
+        sla_statuses: tuple[str, ...] = (
+            TicketStatus.new.value,
+            TicketStatus.open.value,
+            TicketStatus.in_process.value,
+            TicketStatus.S20.value,
+        ),
+        stale_statuses: tuple[str, ...] = (TicketStatus.open.value,),
+        state_path: str | None = None,
+        max_lines: int = 50,
+    ):
+        self.api = api
+        self.notifier = notifier
+        self.chat_id = chat_id
+        self.departments = departments
+        self.sla_warning = timedelta(seconds=sla_warning)
+        self.stale_after = timedelta(seconds=stale_after)
+        self.cooldown = cooldown
+        self.sla_statuses = frozenset(sla_statuses)
+        self.stale_statuses = frozenset(stale_statuses)
+        self.max_lines = max_lines
+
+        self.state = TicketSyncState.load(state_path) if state_path else TicketSyncState()
+        self.deleted_state = (
+            TicketSyncState.load(f"{state_path}.deleted") if state_path else TicketSyncState()
+        )
+        self.tickets: dict[int, _Watch] = {}
+        self._sent: dict[tuple[int, str], tuple[str, float]] = {}
+        self._bootstrapped = False
+
+    # ── Цикл ─────────────────────────────────────────────────────────────────
+
+    def run(self, interval: float = 60.0) -> None:
+        """Бесконечный цикл poll() раз в interval секунд."""
+        while True:
+            started = time.monotonic()
+            try:
+                alerts = self.poll()
+                print(
+                    f"[SlaMonitor] {datetime.now():%H:%M:%S}: в работе {len(self.tickets)}, "
+                    f"уведомлений {len(alerts)}"
+                )
+            except Exception as e:
+                print(f"[SlaMonitor] Ошибка цикла: {e!r}")
+            time.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+    def poll(self, now: datetime | None = None) -> list[Alert]:
+        """Один цикл: догрузить изменения, проверить заявки, отправить уведомления."""
+        if not self._bootstrapped:
+            self._bootstrap()
+        else:
+            result = self.api.tickets.sync_tickets(self.state)
+            for ticket in (*result.created.values(), *result.changed.values()):
+                self._ingest(ticket)
+            deleted = self.api.tickets.sync_tickets(self.deleted_state, deleted=1)
+            for ticket in (*deleted.created.values(), *deleted.changed.values()):
+                self._drop(int(ticket["id"]))
+
+        alerts = self._evaluate(now or datetime.now())
+        self._notify(alerts)
+        return alerts
+
+    def _bootstrap(self) -> None:
+        statuses = sorted(self.sla_statuses | self.stale_statuses)
+        latest = None
+        for page in self.api.tickets.get_tickets_lazy(
+            department_list=self.departments, status_list=statuses
+        ):
+            for ticket in page:
+                self._ingest(ticket)
+                updated = ticket.get("date_updated")
+                if updated and (latest is None or updated > latest):
+                    latest = updated
+        if self.state.watermark is None:
+            self.state.watermark = latest or datetime.now().strftime(DATE_FORMAT)
+            self.state.save()
+        if self.deleted_state.watermark is None:
+            # Удалённые до запуска монитора не интересны — считаем от того же момента
+            self.deleted_state.watermark = self.state.watermark
+            self.deleted_state.save()
+        self._bootstrapped = True
+
+    def _ingest(self, ticket: TicketData) -> None:
+        watch = _Watch(ticket)
+        department = ticket.get("department_id")
+        tracked = watch.status in self.sla_statuses or watch.status in self.stale_statuses
+        in_scope = department is None or department in self.departments
+        if tracked and in_scope and not ticket.get("deleted"):
+            self.tickets[watch.id] = watch
+        else:
+            self._drop(watch.id)
+
+    def _drop(self, ticket_id: int) -> None:
+        if self.tickets.pop(ticket_id, None) is not None:
+            self._sent = {k: v for k, v in self._sent.items() if k[0] != ticket_id}
+
+    # ── Проверки ─────────────────────────────────────────────────────────────
+
+    def _evaluate(self, now: datetime) -> list[Alert]:
+        alerts = []
+        for watch in self.tickets.values():
+            if watch.sla is not None and watch.status in self.sla_statuses:
+                sla = watch.sla.strftime(SLA_FORMAT)
+                if watch.sla <= now:
+                    alerts.append(self._alert(SLA_BREACHED, watch, f"SLA {sla}", sla))
+                elif watch.sla - now <= self.sla_warning:
+                    left = _minutes(watch.sla - now)
+                    alerts.append(self._alert(SLA_SOON, watch, f"SLA {sla}, осталось {left} мин", sla))
+            if (
+                watch.updated is not None
+                and watch.status in self.stale_statuses
+                and now - watch.updated > self.stale_after
+            ):
+                idle = _minutes(now - watch.updated) // 60
+                stamp = watch.updated.strftime(DATE_FORMAT)
+                alerts.append(self._alert(STALE, watch, f"без движения {idle} ч", stamp))
+        return [a for a in alerts if self._due(a)]
+
+    def _alert(self, kind: str, watch: _Watch, detail: str, fingerprint: str) -> Alert:
+        text = f"#{watch.unique_id} {watch.title} — {watch.owner}, {detail}"
+        return Alert(kind, watch.id, text, fingerprint)
+
+    def _due(self, alert: Alert) -> bool:
+        """Дедупликация и cooldown: слать ли уведомление сейчас."""
+        sent = self._sent.get((alert.ticket_id, alert.kind))
+        if sent is None or sent[0] != alert.fingerprint:
+            return True
+        return self.cooldown is not None and time.monotonic() - sent[1] >= self.cooldown
+
+    # ── Уведомления ──────────────────────────────────────────────────────────
+
+    def _notify(self, alerts: list[Alert]) -> None:
+        for kind in (SLA_BREACHED, SLA_SOON, STALE):
+            batch = [a for a in alerts if a.kind == kind]
+            for start in range(0, len(batch), self.max_lines):
+                chunk = batch[start:start + self.max_lines]
+                lines = "\n".join(a.text for a in chunk)
+                self.notifier.send_message(
+                    self.chat_id, f"{_TITLES[kind]} ({len(batch)}):\n{lines}"
+                )
+                sent_at = time.monotonic()
+                for alert in chunk:
+                    self._sent[(alert.ticket_id, alert.kind)] = (alert.fingerprint, sent_at)
+
+
+def _status(value) -> str:
+    return value.value if isinstance(value, TicketStatus) else str(value or "")
+
+
+def _parse(value) -> datetime | None:
+    if not value:
+        return None
+    value = str(value)
+    for fmt, width in ((DATE_FORMAT, 19), (SLA_FORMAT, 16)):
+        try:
+            return datetime.strptime(value[:width], fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def _minutes(delta: timedelta) -> int:
+    return int(delta.total_seconds() // 60)
@@ -0,0 +1 @@
+from store.store import LocalStore
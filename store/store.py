@@ -0,0 +1,247 @@
+import json
+import sqlite3
+import threading
+from enum import Enum
+from typing import Iterable
+
+from models import TicketData, TicketSource, TicketStatus, UserData
+
+_TICKET_COLUMNS = (
+    "id", "pid", "department_id", "status_id", "priority_id", "type_id",
+    "owner_id", "user_id", "source", "date_created", "date_updated",
+)
+_USER_COLUMNS = ("id", "email", "status", "date_created", "date_updated")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tickets (
+    id INTEGER PRIMARY KEY,
+    pid INTEGER,
+    department_id INTEGER,
+    status_id TEXT,
+    priority_id INTEGER,
+    type_id INTEGER,
+    owner_id INTEGER,
+    user_id INTEGER,
+    source TEXT,
+    date_created TEXT,
+    date_updated TEXT,
+    raw TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_tickets_department ON tickets (department_id);
+CREATE INDEX IF NOT EXISTS ix_tickets_status ON tickets (status_id);
+CREATE INDEX IF NOT EXISTS ix_tickets_owner ON tickets (owner_id);
+CREATE INDEX IF NOT EXISTS ix_tickets_user ON tickets (user_id);
+CREATE INDEX IF NOT EXISTS ix_tickets_created ON tickets (date_created);
+CREATE INDEX IF NOT EXISTS ix_tickets_updated ON tickets (date_updated);
+
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY,
+    email TEXT,
+    status TEXT,
+    date_created TEXT,
+    date_updated TEXT,
+    raw TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_users_email ON users (email COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS ix_users_created ON users (date_created);
+CREATE INDEX IF NOT EXISTS ix_users_updated ON users (date_updated);
+"""
+
+
+class LocalStore:
+    """
+    Локальная SQLite-копия заявок и пользователей.
+
+    Заполняется из тех же пагинаторов, что и get_*_lazy(), и отвечает на
+    фильтры get_tickets_page локально, без запросов к API.
+
+        store = LocalStore("hde.sqlite")
+        store.fill_tickets(client, department_list=main_b2c_departments)
+        await store.fill_tickets(async_client, from_date_updated='2025-10-01 00:00:00')
+        open_b2c = store.find_tickets(
+            department_list=main_b2c_departments, status_list=[TicketStatus.open]
+        )
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        if path != ":memory:":
+            self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._db.close()
+
+    # ── Заполнение ───────────────────────────────────────────────────────────
+
+    def fill_tickets(self, api, **filters):
+        """
+        Загружает заявки через api.tickets.get_tickets_lazy(**filters) и сохраняет их.
+
+        Sync:  count = store.fill_tickets(client)
+        Async: count = await store.fill_tickets(async_client)
+        """
+        pages = api.tickets.get_tickets_lazy(**filters)
+        return api._consume_pages(pages, _UpsertSink(self.upsert_tickets))
+
+    def fill_users(self, api, **filters):
+        """
+        Загружает пользователей через api.users.get_users_lazy(**filters) и сохраняет их.
+
+        Sync:  count = store.fill_users(client)
+        Async: count = await store.fill_users(async_client)
+        """
+        pages = api.users.get_users_lazy(**filters)
+        return api._consume_pages(pages, _UpsertSink(self.upsert_users))
+
+    def upsert_tickets(self, tickets: Iterable[TicketData]) -> int:
+        rows = [
+            tuple(_column_value(t.get(c)) for c in _TICKET_COLUMNS)
+            + (json.dumps(t, ensure_ascii=False),)
+            for t in tickets
+        ]
+        self._upsert("tickets", _TICKET_COLUMNS, rows)
+        return len(rows)
+
+    def upsert_users(self, users: Iterable[UserData]) -> int:
+        rows = [
+            tuple(_column_value(u.get(c)) for c in _USER_COLUMNS)
+            + (json.dumps(u, ensure_ascii=False),)
+            for u in users
+        ]
+        self._upsert("users", _USER_COLUMNS, rows)
+        return len(rows)
+
+    def _upsert(self, table: str, columns: tuple[str, ...], rows: list[tuple]) -> None:
+        placeholders = ", ".join("?" * (len(columns) + 1))
+        sql = f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}, raw) VALUES ({placeholders})"
+        with self._lock, self._db:
+            self._db.executemany(sql, rows)
+
+    def delete_ticket(self, ticket_id: int) -> None:
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM tickets WHERE id = ?", (ticket_id,))
+
+    # ── Запросы ──────────────────────────────────────────────────────────────
+
+    def find_tickets(
+        self,
+        department_list: list[int] | None = None,
+        status_list: list[TicketStatus | str] | None = None,
+        owner_list: list[int] | None = None,
+        user_list: list[int] | None = None,
+        priority_list: list[int] | None = None,
+        type_list: list[int] | None = None,
+        source_list: list[TicketSource | str] | None = None,
+        from_date_created: str | None = None,
+        to_date_created: str | None = None,
+        from_date_updated: str | None = None,
+        to_date_updated: str | None = None,
+        order_by: str = "date_created DESC",
+        limit: int | None = None,
+    ) -> list[TicketData]:
+        """
+        Заявки по тем же фильтрам, что принимает get_tickets_page.
+
+        Args:
+            order_by: SQL-сортировка по индексированной колонке, например 'date_updated ASC'.
+            limit: Максимум записей.
+        """
+        where, args = self._ticket_filters(
+            department_list, status_list, owner_list, user_list, priority_list, type_list,
+            source_list, from_date_created, to_date_created, from_date_updated, to_date_updated,
+        )
+        column, _, direction = order_by.partition(" ")
+        if column not in _TICKET_COLUMNS or direction.upper() not in ("", "ASC", "DESC"):
+            raise ValueError(f"Неподдерживаемая сортировка: {order_by}")
+        sql = f"SELECT raw FROM tickets{where} ORDER BY {column} {direction}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            args.append(limit)
+        with self._lock:
+            rows = self._db.execute(sql, args).fetchall()
+        return [json.loads(raw) for (raw,) in rows]
+
+    def count_tickets(self, **filters) -> int:
+        """Количество заявок по фильтрам find_tickets (без сортировки и limit)."""
+        where, args = self._ticket_filters(
+            filters.get("department_list"), filters.get("status_list"),
+            filters.get("owner_list"), filters.get("user_list"),
+            filters.get("priority_list"), filters.get("type_list"),
+            filters.get("source_list"), filters.get("from_date_created"),
+            filters.get("to_date_created"), filters.get("from_date_updated"),
+            filters.get("to_date_updated"),
+        )
+        with self._lock:
+            (count,) = self._db.execute(f"SELECT COUNT(*) FROM tickets{where}", args).fetchone()
+        return count
+
+    def get_ticket(self, ticket_id: int) -> TicketData | None:
+        with self._lock:
+            row = self._db.execute("SELECT raw FROM tickets WHERE id = ?", (ticket_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_user(self, user_id: int) -> UserData | None:
+        with self._lock:
+            row = self._db.execute("SELECT raw FROM users WHERE id = ?", (user_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def find_user_by_email(self, email: str) -> UserData | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT raw FROM users WHERE email = ? COLLATE NOCASE", (email,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    @staticmethod
+    def _ticket_filters(
+        department_list, status_list, owner_list, user_list, priority_list, type_list,
+        source_list, from_date_created, to_date_created, from_date_updated, to_date_updated,
+    ) -> tuple[str, list]:
+        clauses: list[str] = []
+        args: list = []
+        for column, values in (
+            ("department_id", department_list),
+            ("status_id", status_list),
+            ("owner_id", owner_list),
+            ("user_id", user_list),
+            ("priority_id", priority_list),
+            ("type_id", type_list),
+            ("source", source_list),
+        ):
+            if values:
+                clauses.append(f"{column} IN ({', '.join('?' * len(values))})")
+                args.extend(_column_value(v) for v in values)
+        for column, op, value in (
+            ("date_created", ">=", from_date_created),
+            ("date_created", "<=", to_date_created),
+            ("date_updated", ">=", from_date_updated),
+            ("date_updated", "<=", to_date_updated),
+        ):
+            if value is not None:
+                clauses.append(f"{column} {op} ?")
+                args.append(value)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, args
+
+
+class _UpsertSink:
+    """Приёмник страниц для LocalStore.fill_*: пишет каждую страницу в базу."""
+
+    def __init__(self, upsert):
+        self._upsert = upsert
+        self.count = 0
+
+    def feed(self, page: list) -> None:
+        self.count += self._upsert(page)
+
+    def finish(self) -> int:
+        return self.count
+
+
+def _column_value(value):
+    if isinstance(value, Enum):
+        return value.value
+    return value
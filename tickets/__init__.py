@@ -1 +1,4 @@
 from tickets.tickets import Tickets
+from tickets.sync import TicketSyncState, SyncResult
+from tickets.aggregate import TicketAggregator, AggregateResult
+from tickets.sla import SlaFrame, parse_dates, ticket_dates
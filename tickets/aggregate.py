@@ -0,0 +1,89 @@
+from collections import Counter
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any
+
+from config import main_b2c_departments
+from models import TicketData
+
+# Имя группировки → поля ключа
+DEFAULT_GROUPS: dict[str, tuple[str, ...]] = {
+    "status_department": ("status_id", "department_id"),
+    "owner": ("owner_id",),
+    "sla_flag": ("sla_flag",),
+    "rate": ("rate",),
+}
+
+
+@dataclass
+class AggregateResult:
+    """
+    Счётчики TicketAggregator: имя группировки → {ключ: число заявок}.
+
+    Ключ группировки по одному полю — само значение, по нескольким — кортеж.
+    """
+
+    total: int = 0
+    counts: dict[str, dict[Any, int]] = field(default_factory=dict)
+
+    def __getitem__(self, name: str) -> dict[Any, int]:
+        return self.counts[name]
+
+    def top(self, name: str, n: int = 10) -> list[tuple[Any, int]]:
+        return Counter(self.counts[name]).most_common(n)
+
+    def pivot(self, name: str) -> dict[Any, dict[Any, int]]:
+        """Двумерная группировка как таблица: первое поле → {второе поле: число}."""
+        table: dict[Any, dict[Any, int]] = {}
+        for (row, column), count in self.counts[name].items():
+            table.setdefault(row, {})[column] = count
+        return table
+
+
+class TicketAggregator:
+    """
+    Приёмник страниц для Tickets.aggregate(): считает заявки по группам на лету.
+
+    Сами заявки не хранятся — память растёт с числом групп, а не заявок.
+    Заявки вне departments (по умолчанию config.main_b2c_departments)
+    не учитываются, даже если попали в выборку.
+
+        aggregator = TicketAggregator({"by_type": ("type_id",)})
+        result = client._consume_pages(client.tickets.get_tickets_lazy(), aggregator)
+    """
+
+    def __init__(
+        self,
+        groups: dict[str, tuple[str, ...]] | None = None,
+        departments: list[int] | None = main_b2c_departments,
+    ):
+        self.groups = {name: tuple(keys) for name, keys in (groups or DEFAULT_GROUPS).items()}
+        self.departments = frozenset(departments) if departments is not None else None
+        self.total = 0
+        self._counters: dict[str, Counter] = {name: Counter() for name in self.groups}
+
+    def feed(self, page: list[TicketData]) -> None:
+        for ticket in page:
+            if self.departments is not None and ticket.get("department_id") not in self.departments:
+                continue
+            self.total += 1
+            for name, keys in self.groups.items():
+                if len(keys) == 1:
+                    key = _value(ticket.get(keys[0]))
+                else:
+                    key = tuple(_value(ticket.get(k)) for k in keys)
+                self._counters[name][key] += 1
+
+    def finish(self) -> AggregateResult:
+        return AggregateResult(
+            total=self.total,
+            counts={name: dict(counter) for name, counter in self._counters.items()},
+        )
+
+
+def _value(value):
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (list, dict)):
+        return str(value)
+    return value
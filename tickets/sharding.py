@@ -0,0 +1,165 @@
+import math
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+from models import to_records
+from tickets.sync import DATE_FORMAT
+from utils import extract_items
+
+ONE_SECOND = timedelta(seconds=1)
+
+
+class ShardFetchError(RuntimeError):
+    """Запрос границы, окна или страницы шарда не удался — результат был бы неполным."""
+
+
+@dataclass
+class Shard:
+    """Окно по date_created, достаточно мелкое для обычной пагинации."""
+    start: datetime
+    end: datetime
+    total_pages: int = 1
+    pages: dict[int, list] = field(default_factory=dict)
+
+
+class ShardPlanner:
+    """
+    Планировщик шардирования get_tickets_all по окнам date_created.
+
+    Окно запрашивается первой страницей; если pagination.total_pages больше
+    max_shard_pages, окно делится на ceil(total_pages / max_shard_pages)
+    равных частей, и так до тех пор, пока каждое окно не станет «мелким»
+    (или не сожмётся до одной секунды). Первая страница шарда
+    переиспользуется, остальные грузятся параллельно; результат склеивается
+    в хронологическом порядке окон с дедупликацией по id.
+
+    Без to_date_created верхняя граница для деления берётся по самой новой
+    заявке, а последнее окно запрашивается без to_date_created — как и
+    обычная выборка. Часы и часовой пояс клиента в расчёт не входят.
+
+    Если какой-то запрос не удался (ответ None), методы бросают
+    ShardFetchError, и клиент грузит выборку обычной пагинацией: границы
+    не выдумываются, окна не теряются.
+
+    Ввод-вывод делает клиент (HdeApi / HdeApiAsync._fetch_sharded).
+    """
+
+    def __init__(self, params: dict, max_shard_pages: int):
+        self.params = {k: v for k, v in params.items() if k != "page"}
+        self.max_shard_pages = max(1, max_shard_pages)
+        self.start = _parse(self.params.pop("from_date_created", None))
+        self.end = _parse(self.params.pop("to_date_created", None))
+        self.open_end = self.end is None
+
+    @property
+    def needs_end(self) -> bool:
+        return self.end is None
+
+    @property
+    def needs_start(self) -> bool:
+        return self.start is None
+
+    def latest_params(self) -> dict:
+        """Параметры запроса самой новой заявки (если to_date_created не задан)."""
+        params = {**self.params, "order_by": "date_created{desc}"}
+        if self.start is not None:
+            params["from_date_created"] = _fmt(self.start)
+        return params
+
+    def earliest_params(self) -> dict:
+        """Параметры запроса самой ранней заявки (если from_date_created не задан)."""
+        return {**self.params, "to_date_created": _fmt(self.end), "order_by": "date_created{asc}"}
+
+    def set_end(self, response) -> None:
+        # Пустая выборка: граница любая — последнее окно всё равно открыто сверху
+        newest = _first_created(_checked(response, "самую новую заявку"))
+        self.end = newest or self.start or datetime.now().replace(microsecond=0)
+
+    def set_start(self, response) -> None:
+        self.start = _first_created(_checked(response, "самую раннюю заявку")) or self.end
+
+    def initial_shard(self) -> Shard:
+        return Shard(self.start, self.end)
+
+    def params_for(self, shard: Shard) -> dict:
+        params = {**self.params, "from_date_created": _fmt(shard.start)}
+        if not (self.open_end and shard.end == self.end):
+            params["to_date_created"] = _fmt(shard.end)
+        return params
+
+    def assess(self, shard: Shard, response) -> list[Shard]:
+        """
+        Разбирает первую страницу окна.
+
+        Возвращает [] — окно готово (страница 1 сохранена в shard.pages),
+        или список подокон, которые нужно проверить заново.
+        """
+        data = _checked(response, f"окно {_fmt(shard.start)} — {_fmt(shard.end)}").json()
+        total_pages = 1
+        if isinstance(data, dict) and "pagination" in data:
+            total_pages = data["pagination"].get("total_pages", 1) or 1
+        span = int((shard.end - shard.start).total_seconds()) + 1
+        if total_pages <= self.max_shard_pages or span <= 1:
+            shard.total_pages = total_pages
+            shard.pages[1] = extract_items(data) or []
+            return []
+        parts = min(span, math.ceil(total_pages / self.max_shard_pages))
+        return split(shard, parts)
+
+    def add_page(self, shard: Shard, page: int, response) -> None:
+        response = _checked(response, f"страницу {page} окна {_fmt(shard.start)}")
+        shard.pages[page] = extract_items(response.json()) or []
+
+    def merge(self, shards: list[Shard], record_cls=None) -> list[list]:
+        """Страницы всех шардов в хронологическом порядке, без повторов по id."""
+        seen: set[int] = set()
+        result = []
+        for shard in sorted(shards, key=lambda s: s.start):
+            for page_number in sorted(shard.pages):
+                page = []
+                for record in shard.pages[page_number]:
+                    record_id = int(record["id"])
+                    if record_id not in seen:
+                        seen.add(record_id)
+                        page.append(record)
+                if page:
+                    result.append(to_records(page, record_cls) if record_cls is not None else page)
+        return result
+
+
+def split(shard: Shard, parts: int) -> list[Shard]:
+    """Делит окно на parts смежных окон без пересечений (с точностью до секунды)."""
+    span = int((shard.end - shard.start).total_seconds()) + 1
+    step = max(1, span // parts)
+    result = []
+    start = shard.start
+    while start <= shard.end:
+        end = min(shard.end, start + timedelta(seconds=step) - ONE_SECOND)
+        if len(result) == parts - 1:
+            end = shard.end
+        result.append(Shard(start, end))
+        start = end + ONE_SECOND
+    return result
+
+
+def _checked(response, what: str):
+    if response is None:
+        raise ShardFetchError(f"Не удалось загрузить {what}")
+    return response
+
+
+def _first_created(response) -> datetime | None:
+    items = extract_items(response.json())
+    return _parse(items[0].get("date_created")) if items else None
+
+
+def _parse(value) -> datetime | None:
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value.replace(microsecond=0)
+    return datetime.strptime(str(value)[:19], DATE_FORMAT)
+
+
+def _fmt(value: datetime) -> str:
+    return value.strftime(DATE_FORMAT)
@@ -0,0 +1,161 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Iterable
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+TICKET_DATE_FIELDS = ("date_created", "date_updated", "sla_date", "freeze_date", "rate_date")
+
+_WIDTH = 19  # 'YYYY-MM-DD HH:MM:SS'
+_DOT, _SPACE, _COLON, _DASH, _T = ord("."), ord(" "), ord(":"), ord("-"), ord("T")
+_DAYS_IN_MONTH = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+def parse_dates(values: Iterable[str | None]):
+    """
+    Строки дат → numpy.ndarray datetime64[s] одним проходом.
+
+    Понимает 'YYYY-MM-DD HH:MM:SS' (даты заявок) и 'DD.MM.YYYY HH:MM'
+    (sla_date), в том числе без времени; пустые, None и некорректные
+    (например, '0000-00-00 00:00:00') → NaT. Строки раскладываются байтами
+    в ISO-формат векторно, без strptime на каждую; некорректные строки
+    отсеиваются заранее, до приведения к datetime64 (на больших массивах
+    numpy падает на них целиком процессом, а не исключением).
+
+        >>> dates = parse_dates(["0000-00-00 00:00:00"] + ["2025-10-23 08:55:18"] * 999)
+        >>> int(np.isnat(dates).sum()), str(dates[1])
+        (1, '2025-10-23T08:55:18')
+    """
+    _require_numpy()
+    raw = np.array([v if isinstance(v, str) else "" for v in values], dtype=f"U{_WIDTH}")
+    buf = np.char.encode(raw, "ascii", "replace").astype(f"S{_WIDTH}").view(np.uint8)
+    buf = buf.reshape(len(raw), _WIDTH).copy()
+
+    dotted = buf[:, 2] == _DOT
+    if dotted.any():
+        src = buf[dotted]
+        iso = np.zeros_like(src)
+        iso[:, 0:4] = src[:, 6:10]
+        iso[:, 4] = iso[:, 7] = ord("-")
+        iso[:, 5:7] = src[:, 3:5]
+        iso[:, 8:10] = src[:, 0:2]
+        iso[:, 10:_WIDTH] = src[:, 10:_WIDTH]
+        buf[dotted] = iso
+
+    # 'YYYY-MM-DD HH:MM' → 'YYYY-MM-DDTHH:MM'
+    buf[buf[:, 10] == _SPACE, 10] = _T
+    invalid = ~_valid_iso(buf)
+    buf[invalid] = 0
+    buf[invalid, 0:3] = np.frombuffer(b"NaT", dtype=np.uint8)
+    return buf.view(f"S{_WIDTH}").ravel().astype("datetime64[s]")
+
+
+def ticket_dates(page: list, fields: tuple[str, ...] = TICKET_DATE_FIELDS) -> dict[str, Any]:
+    """Поле → datetime64[s]-массив по странице заявок (dict или TicketRecord)."""
+    return {name: parse_dates([t.get(name) for t in page]) for name in fields}
+
+
+@dataclass
+class SlaFrame:
+    """
+    Даты страницы заявок в виде массивов и производные SLA-метрики.
+
+    Все интервалы — numpy timedelta64[s]; NaT там, где даты нет.
+    """
+
+    ids: Any
+    date_created: Any
+    date_updated: Any
+    sla_date: Any
+    now: Any
+
+    @classmethod
+    def from_page(cls, page: list, now: datetime | None = None) -> "SlaFrame":
+        _require_numpy()
+        dates = ticket_dates(page, ("date_created", "date_updated", "sla_date"))
+        return cls(
+            ids=np.array([int(t.get("id")) for t in page], dtype=np.int64),
+            now=np.datetime64(now or datetime.now(), "s"),
+            **dates,
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def age(self):
+        """Сколько прошло с создания заявки."""
+        return self.now - self.date_created
+
+    @property
+    def idle(self):
+        """Сколько прошло с последнего изменения."""
+        return self.now - self.date_updated
+
+    @property
+    def time_to_sla(self):
+        """Сколько осталось до SLA (отрицательное — просрочено)."""
+        return self.sla_date - self.now
+
+    @property
+    def has_sla(self):
+        return ~np.isnat(self.sla_date)
+
+    @property
+    def overdue(self):
+        """Маска: SLA задан и уже прошёл."""
+        return self.has_sla & (self.sla_date <= self.now)
+
+    def due_within(self, seconds: float):
+        """Маска: SLA наступит в ближайшие seconds секунд (ещё не просрочен)."""
+        left = self.time_to_sla
+        return self.has_sla & (left > np.timedelta64(0, "s")) & (
+            left <= np.timedelta64(int(seconds), "s")
+        )
+
+    def idle_longer(self, seconds: float):
+        """Маска: заявка не менялась дольше seconds секунд."""
+        return ~np.isnat(self.date_updated) & (self.idle > np.timedelta64(int(seconds), "s"))
+
+
+def _valid_iso(buf):
+    """Маска строк вида 'YYYY-MM-DD', 'YYYY-MM-DDTHH:MM' или 'YYYY-MM-DDTHH:MM:SS' с верными датой и временем."""
+    digits = (buf >= ord("0")) & (buf <= ord("9"))
+    values = buf.astype(np.int32) - ord("0")
+
+    def number(start: int, end: int):
+        result = np.zeros(len(buf), dtype=np.int32)
+        for column in range(start, end):
+            result = result * 10 + values[:, column]
+        return result
+
+    length = (buf != 0).sum(axis=1)
+    year, month, day = number(0, 4), number(5, 7), number(8, 10)
+    leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+    month_days = np.array(_DAYS_IN_MONTH, dtype=np.int32)[np.clip(month - 1, 0, 11)]
+    month_days = month_days + ((month == 2) & leap)
+    date_ok = (
+        digits[:, [0, 1, 2, 3, 5, 6, 8, 9]].all(axis=1)
+        & (buf[:, 4] == _DASH) & (buf[:, 7] == _DASH)
+        & (year >= 1) & (month >= 1) & (month <= 12) & (day >= 1) & (day <= month_days)
+    )
+    minutes_ok = (
+        (buf[:, 10] == _T) & (buf[:, 13] == _COLON)
+        & digits[:, [11, 12, 14, 15]].all(axis=1)
+        & (number(11, 13) <= 23) & (number(14, 16) <= 59)
+    )
+    seconds_ok = (
+        minutes_ok & (buf[:, 16] == _COLON)
+        & digits[:, [17, 18]].all(axis=1) & (number(17, 19) <= 59)
+    )
+    return date_ok & (
+        (length == 10) | ((length == 16) & minutes_ok) | ((length == 19) & seconds_ok)
+    )
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("Для векторного разбора дат нужен numpy: pip install numpy")
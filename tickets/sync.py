@@ -0,0 +1,129 @@
+import json
+import os
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+from models import TicketData
+
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def _parse_date(value: str) -> datetime:
+    return datetime.strptime(value[:19], DATE_FORMAT)
+
+
+@dataclass
+class TicketSyncState:
+    """
+    Состояние инкрементальной синхронизации заявок.
+
+    watermark — максимальный date_updated из уже полученных заявок.
+    boundary — заявки из окна перекрытия перед watermark (id → date_updated),
+    чтобы повторно не отдавать их при следующем запуске.
+
+        state = TicketSyncState.load("tickets_sync.json")
+        result = client.tickets.sync_tickets(state)
+    """
+
+    watermark: str | None = None
+    boundary: dict[int, str] = field(default_factory=dict)
+    path: str | None = None
+
+    @classmethod
+    def load(cls, path: str) -> "TicketSyncState":
+        if not os.path.exists(path):
+            return cls(path=path)
+        with open(path, encoding="utf-8") as f:
+            raw = json.load(f)
+        return cls(
+            watermark=raw.get("watermark"),
+            boundary={int(k): v for k, v in raw.get("boundary", {}).items()},
+            path=path,
+        )
+
+    def save(self, path: str | None = None) -> None:
+        path = path or self.path
+        if path is None:
+            return
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"watermark": self.watermark, "boundary": self.boundary}, f)
+        os.replace(tmp, path)
+
+
+@dataclass
+class SyncResult:
+    """Результат синхронизации: новые и изменённые заявки по id."""
+
+    created: dict[int, TicketData]
+    changed: dict[int, TicketData]
+    watermark: str | None
+
+    def __len__(self) -> int:
+        return len(self.created) + len(self.changed)
+
+
+class TicketSyncer:
+    """
+    Приёмник страниц для Tickets.sync_tickets().
+
+    Запрос строится от watermark минус overlap_seconds (защита от одинаковых
+    date_updated и расхождения часов), заявки дедуплицируются по id.
+    """
+
+    def __init__(self, state: TicketSyncState, overlap_seconds: int = 300):
+        self.state = state
+        self.overlap = timedelta(seconds=overlap_seconds)
+        self._watermark = _parse_date(state.watermark) if state.watermark else None
+        self._created: dict[int, TicketData] = {}
+        self._changed: dict[int, TicketData] = {}
+        self._seen: dict[int, str] = {}
+
+    def params(self) -> dict:
+        if self._watermark is None:
+            return {"order_by": "date_updated{asc}"}
+        return {
+            "from_date_updated": (self._watermark - self.overlap).strftime(DATE_FORMAT),
+            "order_by": "date_updated{asc}",
+        }
+
+    def feed(self, page: list[TicketData]) -> None:
+        for ticket in page:
+            ticket_id = int(ticket["id"])
+            updated = ticket.get("date_updated") or ""
+            if self.state.boundary.get(ticket_id) == updated:
+                continue
+            self._seen[ticket_id] = updated
+            if ticket_id in self._created:
+                self._created[ticket_id] = ticket
+            elif self._is_new(ticket_id, ticket):
+                self._changed.pop(ticket_id, None)
+                self._created[ticket_id] = ticket
+            else:
+                self._changed[ticket_id] = ticket
+
+    def _is_new(self, ticket_id: int, ticket: TicketData) -> bool:
+        if self._watermark is None:
+            return True
+        created = ticket.get("date_created")
+        if not created:
+            return False
+        created_at = _parse_date(created)
+        if created_at > self._watermark:
+            return True
+        return created_at > self._watermark - self.overlap and ticket_id not in self.state.boundary
+
+    def finish(self) -> SyncResult:
+        candidates = {**self.state.boundary, **self._seen}
+        dates = [v for v in candidates.values() if v]
+        if dates:
+            watermark = max(dates, key=_parse_date)
+            cutoff = _parse_date(watermark) - self.overlap
+            self.state.watermark = watermark
+            self.state.boundary = {
+                k: v for k, v in candidates.items() if v and _parse_date(v) >= cutoff
+            }
+        self.state.save()
+        return SyncResult(
+            created=self._created, changed=self._changed, watermark=self.state.watermark
+        )
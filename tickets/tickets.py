@@ -1,4 +1,4 @@
-from typing import Unpack, Annotated, Any
+from typing import Iterable, Unpack, Annotated, Any
 
 from models import (
     GetTicketExtraParams,
@@ -7,7 +7,11 @@ from models import (
     UpdateTicketParams,
     TicketSource,
     TicketStatus,
+    TicketRecord,
 )
+from config import main_b2c_departments
+from tickets.aggregate import TicketAggregator
+from tickets.sync import TicketSyncer, TicketSyncState
 
 
 class Tickets:
@@ -91,6 +95,29 @@ class Tickets:
         """
         return self._api._request("GET", f"tickets/{ticket_id}/")
 
+    def get_tickets_by_ids(self, ids, max_concurrent: int | None = None):
+        """
+        Получить заявки по списку ID.
+
+        У GET /tickets/ нет фильтра по ID, поэтому заявки запрашиваются
+        по одной, параллельно (не больше max_concurrent одновременно).
+        Повторяющиеся ID запрашиваются один раз.
+
+        Sync:  result = client.tickets.get_tickets_by_ids([1, 2, 3])
+        Async: result = await async_client.tickets.get_tickets_by_ids([1, 2, 3])
+
+        Args:
+            ids: ID заявок.
+            max_concurrent: Максимум одновременных запросов
+                            (по умолчанию — rate_limiter.max_concurrency).
+
+        Returns:
+            BatchResult: found — {id: заявка}, missing — ненайденные ID.
+        """
+        return self._api._fetch_by_ids(
+            lambda chunk: self.get_ticket_by_id(chunk[0]), ids, max_concurrent=max_concurrent
+        )
+
     # ── POST /tickets/ ────────────────────────────────────────────────────────
 
     def create_ticket(
@@ -113,6 +140,7 @@ class Tickets:
         create_from_user: int | None = None,
         custom_fields: dict[str, Any] | None = None,
         tags: list[str | int] | None = None,
+        idempotency_guard=None,
     ):
         """
         Создать заявку.
@@ -139,6 +167,8 @@ class Tickets:
             create_from_user: 1 — от имени клиента, 0 — от имени сотрудника.
             custom_fields: Индивидуальные поля {'field_id': value}.
             tags: Метки.
+            idempotency_guard: Проверка «заявка уже создана?» перед повтором
+                               после таймаута / 5xx. Без неё POST не повторяется.
         """
         data: CreateTicketParams = {
             "title": title,
@@ -167,7 +197,9 @@ class Tickets:
             if v is not None:
                 data[k] = v
 
-        return self._api._request("POST", "tickets/", data=data)
+        return self._api._request(
+            "POST", "tickets/", data=data, idempotency_guard=idempotency_guard
+        )
 
     # ── PUT /tickets/:id/ ─────────────────────────────────────────────────────
 
@@ -262,6 +294,87 @@ class Tickets:
         params = {"delete": "true"} if hard_delete else None
         return self._api._request("DELETE", f"tickets/{ticket_id}/", params=params)
 
+    # ── Массовые операции ─────────────────────────────────────────────────────
+
+    def bulk_update(
+        self,
+        updates: Iterable[tuple[int, UpdateTicketParams]],
+        max_concurrent: int | None = None,
+        retry=None,
+        dry_run: bool = False,
+        rate: float | None = None,
+        on_progress=None,
+    ):
+        """
+        Обновить много заявок параллельно.
+
+        Sync:  result = client.tickets.bulk_update((tid, {'owner_id': 7}) for tid in ids)
+        Async: result = await async_client.tickets.bulk_update(updates)
+
+        Args:
+            updates: Пары (ticket_id, UpdateTicketParams); читаются по мере выполнения.
+            max_concurrent: Максимум одновременных запросов (по умолчанию —
+                            rate_limiter.max_concurrency клиента).
+            retry: clients.retry.RetryPolicy для каждой заявки (по умолчанию — клиента).
+            dry_run: Ничего не отправлять, только вернуть план в result.planned.
+            rate: Потолок запросов в секунду для этой операции.
+            on_progress: on_progress(done, total, ticket_id, ok) после каждой заявки.
+
+        Returns:
+            clients.bulk.BulkResult: succeeded (ticket_id → заявка), failed (ticket_id → ошибка).
+        """
+        if hasattr(updates, "__len__"):
+            items = [(int(ticket_id), data) for ticket_id, data in updates]
+        else:
+            items = ((int(ticket_id), data) for ticket_id, data in updates)
+        return self._api._run_bulk(
+            items,
+            lambda ticket_id, data: self._api._request(
+                "PUT", f"tickets/{ticket_id}/", data=data, retry=retry
+            ),
+            max_concurrent=max_concurrent,
+            dry_run=dry_run,
+            rate=rate,
+            on_progress=on_progress,
+        )
+
+    def bulk_delete(
+        self,
+        ticket_ids: Iterable[int],
+        hard_delete: bool = False,
+        max_concurrent: int | None = None,
+        retry=None,
+        dry_run: bool = False,
+        rate: float | None = None,
+        on_progress=None,
+    ):
+        """
+        Удалить много заявок параллельно (см. bulk_update).
+
+        Sync:  result = client.tickets.bulk_delete(ids, dry_run=True)
+        Async: result = await async_client.tickets.bulk_delete(ids, hard_delete=True)
+
+        Args:
+            ticket_ids: ID заявок.
+            hard_delete: True — полное удаление, False — перенос в удалённые.
+            max_concurrent, retry, dry_run, rate, on_progress: Как в bulk_update.
+        """
+        params = {"delete": "true"} if hard_delete else None
+        if hasattr(ticket_ids, "__len__"):
+            items = [(int(ticket_id), params) for ticket_id in ticket_ids]
+        else:
+            items = ((int(ticket_id), params) for ticket_id in ticket_ids)
+        return self._api._run_bulk(
+            items,
+            lambda ticket_id, params: self._api._request(
+                "DELETE", f"tickets/{ticket_id}/", params=params, retry=retry
+            ),
+            max_concurrent=max_concurrent,
+            dry_run=dry_run,
+            rate=rate,
+            on_progress=on_progress,
+        )
+
     # ── Пагинация ─────────────────────────────────────────────────────────────
 
     def get_tickets_lazy(
@@ -276,6 +389,9 @@ class Tickets:
         department_list: list[int] | None = None,
         user_list: list[int] | None = None,
         owner_list: list[int] | None = None,
+        as_records: bool = False,
+        checkpoint=None,
+        guard=None,
         **kwargs: Unpack[GetTicketExtraParams],
     ):
         """
@@ -295,6 +411,10 @@ class Tickets:
             department_list: Список ID отделов.
             user_list: Список ID владельцев.
             owner_list: Список ID исполнителей.
+            as_records: Отдавать TicketRecord (__slots__) вместо dict — меньше памяти.
+            checkpoint: export.Checkpoint — продолжить с места прошлого падения.
+            guard: clients.consistency.ConsistencyGuard — убрать повторы и добрать
+                   пропуски из-за сдвига страниц; отчёт в guard.report.
             **kwargs: Дополнительные фильтры (from_date_updated, to_date_updated,
                       freeze, deleted, order_by).
         """
@@ -311,7 +431,13 @@ class Tickets:
             "owner_list": owner_list,
             **kwargs,
         }
-        return self._api._paginate_lazy(self.get_tickets_page, params)
+        return self._api._paginate_lazy(
+            self.get_tickets_page,
+            params,
+            record_cls=TicketRecord if as_records else None,
+            checkpoint=checkpoint,
+            guard=guard,
+        )
 
     def get_tickets_all(
         self,
@@ -325,6 +451,9 @@ class Tickets:
         department_list: list[int] | None = None,
         user_list: list[int] | None = None,
         owner_list: list[int] | None = None,
+        as_records: bool = False,
+        max_shard_pages: int | None = None,
+        guard=None,
         **kwargs: Unpack[GetTicketExtraParams],
     ):
         """
@@ -344,9 +473,18 @@ class Tickets:
             department_list: Список ID отделов.
             user_list: Список ID владельцев.
             owner_list: Список ID исполнителей.
+            as_records: Отдавать TicketRecord (__slots__) вместо dict — меньше памяти.
+            max_shard_pages: Если задан — грузить окнами date_created не глубже
+                             max_shard_pages страниц каждое (для очень больших выборок,
+                             можно вместе с from_date_created / to_date_created в kwargs).
+            guard: clients.consistency.ConsistencyGuard — убрать повторы и добрать
+                   пропуски из-за сдвига страниц; отчёт в guard.report.
+                   Не сочетается с max_shard_pages (шарды и так склеиваются без повторов).
             **kwargs: Дополнительные фильтры (from_date_updated, to_date_updated,
                       freeze, deleted, order_by).
         """
+        if max_shard_pages is not None and guard is not None:
+            raise ValueError("guard не поддерживается вместе с max_shard_pages")
         params = {
             "search": search,
             "exact_search": exact_search,
@@ -360,4 +498,74 @@ class Tickets:
             "owner_list": owner_list,
             **kwargs,
         }
-        return self._api._paginate_all(self.get_tickets_page, params)
+        record_cls = TicketRecord if as_records else None
+        if max_shard_pages is not None:
+            return self._api._fetch_sharded(
+                self.get_tickets_page, params, max_shard_pages, record_cls=record_cls
+            )
+        return self._api._paginate_all(
+            self.get_tickets_page, params, record_cls=record_cls, guard=guard
+        )
+
+    # ── Агрегация ─────────────────────────────────────────────────────────────
+
+    def aggregate(
+        self,
+        groups: dict[str, tuple[str, ...]] | None = None,
+        department_list: list[int] | None = main_b2c_departments,
+        **filters,
+    ):
+        """
+        Счётчики заявок по группам без загрузки всех заявок в память.
+
+        По умолчанию — status_id × department_id, owner_id, sla_flag и rate
+        по отделам config.main_b2c_departments.
+
+        Sync:  result = client.tickets.aggregate(from_date_created='2025-10-01 00:00:00')
+        Async: result = await async_client.tickets.aggregate(groups={'owner': ('owner_id',)})
+
+        Args:
+            groups: Имя → поля ключа группировки (по умолчанию aggregate.DEFAULT_GROUPS).
+            department_list: Отделы; None — все.
+            **filters: Фильтры get_tickets_lazy (status_list, from_date_created, ...).
+
+        Returns:
+            AggregateResult: total и counts[имя] → {ключ: число}.
+        """
+        pages = self.get_tickets_lazy(department_list=department_list, **filters)
+        return self._api._consume_pages(pages, TicketAggregator(groups, department_list))
+
+    # ── Инкрементальная синхронизация ─────────────────────────────────────────
+
+    def sync_tickets(
+        self,
+        state: TicketSyncState,
+        overlap_seconds: int = 300,
+        **filters,
+    ):
+        """
+        Загружает только заявки, изменённые после прошлой синхронизации.
+
+        Запрос идёт с from_date_updated = watermark - overlap_seconds,
+        дубли из окна перекрытия отбрасываются по id. Страницы берутся
+        по date_updated (keyset), а не по номерам: заявка, изменённая
+        во время синхронизации, не сдвигает остальные. Если у state задан
+        path, новое состояние сохраняется в файл.
+
+        Sync:  result = client.tickets.sync_tickets(TicketSyncState.load('sync.json'))
+        Async: result = await async_client.tickets.sync_tickets(state)
+
+        Args:
+            state: Состояние синхронизации (watermark + граница перекрытия).
+            overlap_seconds: Окно перекрытия на совпадающие даты и расхождение часов.
+            **filters: Фильтры get_tickets_lazy (department_list, status_list, ...).
+
+        Returns:
+            SyncResult с created / changed: {id: ticket}.
+        """
+        syncer = TicketSyncer(state, overlap_seconds)
+        params = {**filters, **syncer.params()}
+        pages = self._api._paginate_keyset(
+            self.get_tickets_page, params, "date_updated", "from_date_updated"
+        )
+        return self._api._consume_pages(pages, syncer)
@@ -0,0 +1,82 @@
+"""
+Потоковый экспорт заявок в Excel.
+По умолчанию — отделы main_b2c_departments, колонки TICKET_COLUMNS.
+
+С resumable=True страницы сначала пишутся в <filename>.jsonl с checkpoint
+<filename>.ckpt; после падения запуск с тем же filename продолжит
+с последней обработанной страницы, а Excel соберётся из накопленного файла.
+Если выгрузка оборвалась, файлы остаются на месте и скрипт завершается с ошибкой.
+"""
+import asyncio
+import os
+from datetime import datetime
+
+from dotenv import load_dotenv
+
+from clients.api_client_async import HdeApiAsync
+from config import main_b2c_departments
+from export import (
+    Checkpoint,
+    Column,
+    ExcelExporter,
+    JsonlWriter,
+    TICKET_COLUMNS,
+    read_jsonl_pages,
+)
+
+load_dotenv()
+
+PREFETCH_PAGES = 10
+
+
+async def export_tickets_to_excel(
+    filename: str = None,
+    columns: list[Column] = TICKET_COLUMNS,
+    department_list: list[int] = main_b2c_departments,
+    resumable: bool = False,
+    **filters,
+):
+    if filename is None:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"tickets_export_{timestamp}.xlsx"
+
+    print(f"Экспорт в {filename}...")
+    exporter = ExcelExporter(filename, columns, sheet_title="Заявки")
+
+    async with HdeApiAsync(
+        os.getenv("HDE_TOKEN"),
+        os.getenv("HDE_EMAIL"),
+        os.getenv("HDE_BASE_URL"),
+        prefetch_pages=PREFETCH_PAGES,
+    ) as client:
+        if not resumable:
+            pages = client.tickets.get_tickets_lazy(department_list=department_list, **filters)
+            total = await exporter.export_async(pages)
+            print(f"Готово: {total} заявок → {filename}")
+            return
+
+        spool, checkpoint = f"{filename}.jsonl", Checkpoint(f"{filename}.ckpt")
+        if checkpoint.resumed:
+            print(f"Продолжаем со страницы {checkpoint.next_page}")
+        with JsonlWriter(spool, checkpoint) as out:
+            pages = client.tickets.get_tickets_lazy(
+                department_list=department_list, checkpoint=checkpoint, **filters
+            )
+            async for page in pages:
+                out.write_page(page)
+
+    if not checkpoint.done:
+        print(
+            f"Выгрузка не завершена: {spool} и {checkpoint.path} сохранены, "
+            f"повторный запуск продолжит со страницы {checkpoint.next_page}"
+        )
+        raise SystemExit(1)
+
+    total = await asyncio.to_thread(exporter.export, read_jsonl_pages(spool))
+    os.remove(spool)
+    os.remove(checkpoint.path)
+    print(f"Готово: {total} заявок → {filename}")
+
+
+if __name__ == "__main__":
+    asyncio.run(export_tickets_to_excel())
@@ -0,0 +1,28 @@
+"""
+Мониторинг SLA заявок main_b2c_departments с уведомлениями в чат monitoring_chat_id.
+Состояние синхронизации (watermark) хранится в sla_monitor.json и sla_monitor.json.deleted
+рядом со скриптом запуска.
+"""
+import os
+
+from dotenv import load_dotenv
+
+from clients.api_client import HdeApi
+from clients.pachka_api import PachkaApi
+from monitoring import SlaMonitor
+
+load_dotenv()
+
+POLL_INTERVAL = 60
+
+
+def main():
+    client = HdeApi(os.getenv("HDE_TOKEN"), os.getenv("HDE_EMAIL"), os.getenv("HDE_BASE_URL"))
+    pachka = PachkaApi(os.getenv("PACHCA_API_TOKEN"))
+    monitor = SlaMonitor(client, pachka, state_path="sla_monitor.json")
+    with client, pachka:
+        monitor.run(interval=POLL_INTERVAL)
+
+
+if __name__ == "__main__":
+    main()
@@ -1 +1,3 @@
 from users.users import Users
+from users.importer import EmailIndex, ImportResult, read_users_csv
+from users.directory import UserDirectory
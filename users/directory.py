@@ -0,0 +1,199 @@
+import asyncio
+import sys
+import threading
+from datetime import datetime, timedelta
+
+from models import UserRecord
+from users.importer import normalize_email
+
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+class UserDirectory:
+    """
+    Справочник пользователей в памяти: id → UserRecord и email → id.
+
+    Первый refresh() загружает всех пользователей, следующие — только
+    изменённые (from_date_updated от последнего date_updated минус
+    overlap_seconds). Поиск — обычные обращения к dict, поэтому безопасен
+    из любых потоков и задач; обновление идёт под блокировкой.
+
+        directory = UserDirectory()
+        directory.refresh(client)
+        directory.start(client, interval=600)        # фоновое обновление в потоке
+        name = directory.display_name(ticket['owner_id'])
+
+        task = asyncio.create_task(directory.run(async_client, interval=600))
+    """
+
+    def __init__(self, overlap_seconds: int = 300):
+        self.overlap = timedelta(seconds=overlap_seconds)
+        self.watermark: datetime | None = None
+        self.refreshed_at: datetime | None = None
+
+        self._lock = threading.Lock()
+        self._records: dict[int, UserRecord] = {}
+        self._emails: dict[str, int] = {}
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    # ── Поиск ────────────────────────────────────────────────────────────────
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, user_id: int) -> bool:
+        return user_id in self._records
+
+    def get(self, user_id: int | None) -> UserRecord | None:
+        if user_id is None:
+            return None
+        return self._records.get(int(user_id))
+
+    def id_by_email(self, email: str | None) -> int | None:
+        return self._emails.get(normalize_email(email))
+
+    def by_email(self, email: str | None) -> UserRecord | None:
+        return self.get(self.id_by_email(email))
+
+    def display_name(self, user_id: int | None, default: str = "") -> str:
+        """«Имя Фамилия» пользователя или default."""
+        user = self.get(user_id)
+        if user is None:
+            return default
+        return " ".join(p for p in (user.name, user.lastname) if p) or user.email or default
+
+    # ── Обновление ───────────────────────────────────────────────────────────
+
+    def refresh(self, api, **filters):
+        """
+        Догружает пользователей, изменённых с прошлого обновления.
+
+        Sync:  count = directory.refresh(client)
+        Async: count = await directory.refresh(async_client)
+        """
+        params = {"order_by": "date_updated{asc}", **filters}
+        if self.watermark is not None:
+            params["from_date_updated"] = (self.watermark - self.overlap).strftime(DATE_FORMAT)
+        pages = api.users.get_users_lazy(as_records=True, **params)
+        return api._consume_pages(pages, _DirectorySink(self))
+
+    def add(self, users) -> int:
+        """Добавляет / заменяет записи (UserRecord или dict)."""
+        count = 0
+        with self._lock:
+            for user in users:
+                if not isinstance(user, UserRecord):
+                    user = UserRecord(user)
+                user_id = int(user.id)
+                previous = self._records.get(user_id)
+                if previous is not None and previous.email != user.email:
+                    self._emails.pop(normalize_email(previous.email), None)
+                self._records[user_id] = user
+                email = normalize_email(user.email)
+                if email:
+                    self._emails[email] = user_id
+                updated = _parse_date(user.date_updated)
+                if updated is not None and (self.watermark is None or updated > self.watermark):
+                    self.watermark = updated
+                count += 1
+        return count
+
+    def remove(self, user_id: int) -> None:
+        with self._lock:
+            user = self._records.pop(int(user_id), None)
+            if user is not None:
+                self._emails.pop(normalize_email(user.email), None)
+
+    # ── Фоновое обновление ───────────────────────────────────────────────────
+
+    def start(self, api, interval: float = 600.0) -> threading.Thread:
+        """Обновляет справочник каждые interval секунд в фоновом потоке (sync-клиент)."""
+        if self._thread is not None and self._thread.is_alive():
+            return self._thread
+        self._stop.clear()
+
+        def loop():
+            while not self._stop.is_set():
+                try:
+                    self.refresh(api)
+                except Exception as e:
+                    print(f"[UserDirectory] Ошибка обновления: {e!r}")
+                self._stop.wait(interval)
+
+        self._thread = threading.Thread(target=loop, name="hde-user-directory", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    async def run(self, api, interval: float = 600.0) -> None:
+        """Обновляет справочник каждые interval секунд (async-клиент); отменяется через task.cancel()."""
+        while True:
+            try:
+                await self.refresh(api)
+            except Exception as e:
+                print(f"[UserDirectory] Ошибка обновления: {e!r}")
+            await asyncio.sleep(interval)
+
+    # ── Память ───────────────────────────────────────────────────────────────
+
+    def memory_report(self) -> dict[str, int]:
+        """Примерный объём памяти справочника в байтах (записи + индексы)."""
+        with self._lock:
+            records = list(self._records.values())
+            emails = list(self._emails)
+            records_bytes = sum(_record_size(r) for r in records)
+            index_bytes = (
+                sys.getsizeof(self._records)
+                + sys.getsizeof(self._emails)
+                + sum(sys.getsizeof(e) for e in emails)
+            )
+        return {
+            "users": len(records),
+            "emails": len(emails),
+            "records_bytes": records_bytes,
+            "index_bytes": index_bytes,
+            "total_bytes": records_bytes + index_bytes,
+        }
+
+
+class _DirectorySink:
+    """Приёмник страниц для UserDirectory.refresh()."""
+
+    def __init__(self, directory: UserDirectory):
+        self._directory = directory
+        self.count = 0
+
+    def feed(self, page: list) -> None:
+        self.count += self._directory.add(page)
+
+    def finish(self) -> int:
+        self._directory.refreshed_at = datetime.now()
+        return self.count
+
+
+def _record_size(record: UserRecord) -> int:
+    size = sys.getsizeof(record)
+    for slot in type(record).__slots__:
+        # Интернированные строки общие для всех записей — их не считаем
+        if slot in record._interned:
+            continue
+        # Незаполненный слот (поля не было в ответе) даёт None
+        value = getattr(record, slot, None)
+        if value is not None:
+            size += sys.getsizeof(value)
+    return size
+
+
+def _parse_date(value) -> datetime | None:
+    if not value:
+        return None
+    try:
+        return datetime.strptime(str(value)[:19], DATE_FORMAT)
+    except ValueError:
+        return None
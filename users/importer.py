@@ -0,0 +1,134 @@
+import csv
+from dataclasses import dataclass, field
+from typing import Any, Iterable
+
+from clients.bulk import BulkResult
+from models import CreateUserParams, UserData
+
+_INT_FIELDS = frozenset({"group_id", "organiz_id", "notifications"})
+_CUSTOM_PREFIX = "custom_fields."
+
+
+def normalize_email(email: str | None) -> str:
+    return (email or "").strip().lower()
+
+
+class EmailIndex:
+    """
+    Приёмник страниц пользователей: email → id.
+
+    Хранит только пары email / id, поэтому индекс на десятки тысяч
+    пользователей занимает единицы мегабайт.
+    """
+
+    def __init__(self):
+        self.ids: dict[str, int] = {}
+
+    def feed(self, page: list[UserData]) -> None:
+        for user in page:
+            email = normalize_email(user.get("email"))
+            if email:
+                self.ids[email] = int(user["id"])
+
+    def finish(self) -> dict[str, int]:
+        return self.ids
+
+
+@dataclass
+class ImportResult:
+    """
+    Итог Users.import_users по email.
+
+    created / updated — email → данные пользователя из ответа,
+    skipped — email (или «#N» для строки без email) → причина,
+    failed — email → ошибка, planned — email → ('create' | 'update', данные)
+    при dry_run.
+    """
+
+    created: dict[str, Any] = field(default_factory=dict)
+    updated: dict[str, Any] = field(default_factory=dict)
+    skipped: dict[str, str] = field(default_factory=dict)
+    failed: dict[str, str] = field(default_factory=dict)
+    planned: dict[str, tuple[str, CreateUserParams]] = field(default_factory=dict)
+
+    def merge(self, bulk: BulkResult) -> "ImportResult":
+        for (action, email), user in bulk.succeeded.items():
+            (self.created if action == "create" else self.updated)[email] = user
+        for (_, email), error in bulk.failed.items():
+            self.failed[email] = error
+        for (action, email), (_, data) in bulk.planned.items():
+            self.planned[email] = (action, data)
+        return self
+
+    def summary(self) -> str:
+        if self.planned:
+            return f"dry-run: запланировано {len(self.planned)}, пропущено {len(self.skipped)}"
+        return (
+            f"создано {len(self.created)}, обновлено {len(self.updated)}, "
+            f"пропущено {len(self.skipped)}, с ошибкой {len(self.failed)}"
+        )
+
+
+def route_rows(
+    rows: Iterable[CreateUserParams],
+    index: dict[str, int],
+    result: ImportResult,
+    update_existing: bool = True,
+) -> list[tuple[tuple[str, str], tuple[int | None, CreateUserParams]]]:
+    """
+    Раскладывает строки на создание и обновление по индексу email → id.
+
+    Возвращает задания для _run_bulk: ((action, email), (user_id, data));
+    пропущенные строки сразу пишутся в result.skipped.
+    """
+    jobs = []
+    taken: set[str] = set()
+    for number, row in enumerate(rows, start=1):
+        email = normalize_email(row.get("email"))
+        if not email:
+            result.skipped[f"#{number}"] = "нет email"
+            continue
+        if email in taken:
+            result.skipped[email] = f"повтор email (строка {number})"
+            continue
+        taken.add(email)
+        data = {k: v for k, v in row.items() if v is not None and v != ""}
+        data["email"] = email
+        user_id = index.get(email)
+        if user_id is None:
+            if not data.get("name"):
+                result.skipped[email] = "нет name для нового пользователя"
+                continue
+            jobs.append((("create", email), (None, data)))
+        elif update_existing:
+            # Пароль существующим пользователям при импорте не меняем
+            data.pop("password", None)
+            jobs.append((("update", email), (user_id, data)))
+        else:
+            result.skipped[email] = f"уже есть (id {user_id})"
+    return jobs
+
+
+def read_users_csv(path: str, delimiter: str = ",", encoding: str = "utf-8-sig"):
+    """
+    Строки CSV → CreateUserParams.
+
+    Заголовки — имена полей CreateUserParams; department — ID через «;»,
+    индивидуальные поля — колонки custom_fields.<id>. Пустые ячейки пропускаются.
+    """
+    with open(path, newline="", encoding=encoding) as f:
+        for raw in csv.DictReader(f, delimiter=delimiter):
+            row: dict[str, Any] = {}
+            for key, value in raw.items():
+                if key is None or value is None or not value.strip():
+                    continue
+                key, value = key.strip(), value.strip()
+                if key.startswith(_CUSTOM_PREFIX):
+                    row.setdefault("custom_fields", {})[key[len(_CUSTOM_PREFIX):]] = value
+                elif key == "department":
+                    row[key] = [int(d) for d in value.split(";") if d.strip()]
+                elif key in _INT_FIELDS:
+                    row[key] = int(value)
+                else:
+                    row[key] = value
+            yield row
@@ -1,11 +1,15 @@
-from typing import Unpack, Any
+from typing import Iterable, Unpack, Any
 
 from models import (
     GetUsersExtraParams,
     GetUsersParams,
     CreateUserParams,
     UpdateUserParams,
+    UserRecord,
 )
+from users.importer import EmailIndex, ImportResult, read_users_csv, route_rows
+
+USERS_PER_PAGE = 30
 
 
 class Users:
@@ -65,6 +69,31 @@ class Users:
         """
         return self._api._request("GET", f"users/{user_id}/")
 
+    def get_users_by_ids(self, ids, max_concurrent: int | None = None):
+        """
+        Получить пользователей по списку ID.
+
+        ID передаются фильтром id_list пачками по размеру страницы (30),
+        пачки загружаются параллельно. Повторяющиеся ID запрашиваются один раз.
+
+        Sync:  result = client.users.get_users_by_ids([1, 2, 3])
+        Async: result = await async_client.users.get_users_by_ids([1, 2, 3])
+
+        Args:
+            ids: ID пользователей.
+            max_concurrent: Максимум одновременных запросов
+                            (по умолчанию — rate_limiter.max_concurrency).
+
+        Returns:
+            BatchResult: found — {id: пользователь}, missing — ненайденные ID.
+        """
+        return self._api._fetch_by_ids(
+            lambda chunk: self.get_users_page(id_list=",".join(map(str, chunk))),
+            ids,
+            chunk_size=USERS_PER_PAGE,
+            max_concurrent=max_concurrent,
+        )
+
     # ── POST /users/ ─────────────────────────────────────────────────────────
 
     def create_user(
@@ -230,6 +259,64 @@ class Users:
         """
         return self._api._request("DELETE", f"users/{user_id}/")
 
+    # ── Массовый импорт ───────────────────────────────────────────────────────
+
+    def import_users(
+        self,
+        rows: Iterable[CreateUserParams] | str,
+        update_existing: bool = True,
+        max_concurrent: int | None = None,
+        dry_run: bool = False,
+        index: dict[str, int] | None = None,
+        on_progress=None,
+    ):
+        """
+        Импортировать пользователей: новые создать, существующие обновить.
+
+        Сначала по get_users_lazy() строится индекс email → id (один проход по
+        списку вместо поиска на каждую строку), затем записи создаются / обновляются
+        параллельно через _run_bulk. Пароль существующим пользователям не меняется.
+
+        Sync:  result = client.users.import_users("users.csv")
+        Async: result = await async_client.users.import_users(rows)
+
+        Args:
+            rows: CreateUserParams по строкам или путь к CSV (см. read_users_csv).
+            update_existing: False — существующих пользователей пропускать.
+            max_concurrent: Максимум одновременных запросов (по умолчанию —
+                            rate_limiter.max_concurrency клиента).
+            dry_run: Ничего не отправлять, только вернуть план в result.planned.
+            index: Готовый индекс email → id (тогда список пользователей не грузится).
+            on_progress: on_progress(done, total, (action, email), ok) после каждой записи.
+
+        Returns:
+            ImportResult: created / updated / skipped / failed по email.
+        """
+        if isinstance(rows, str):
+            rows = read_users_csv(rows)
+        result = ImportResult()
+
+        def write(key, payload):
+            user_id, data = payload
+            if user_id is None:
+                return self._api._request("POST", "users/", data=data)
+            return self._api._request("PUT", f"users/{user_id}/", data=data)
+
+        def run(email_index):
+            jobs = route_rows(rows, email_index, result, update_existing)
+            bulk = self._api._run_bulk(
+                jobs,
+                write,
+                max_concurrent=max_concurrent,
+                dry_run=dry_run,
+                on_progress=on_progress,
+            )
+            return self._api._then(bulk, result.merge)
+
+        if index is None:
+            index = self._api._consume_pages(self.get_users_lazy(), EmailIndex())
+        return self._api._then(index, run)
+
     # ── Пагинация ─────────────────────────────────────────────────────────────
 
     def get_users_lazy(
@@ -239,6 +326,8 @@ class Users:
         group_list: str | None = None,
         id_list: str | None = None,
         organization_list: str | None = None,
+        as_records: bool = False,
+        checkpoint=None,
         **kwargs: Unpack[GetUsersExtraParams],
     ):
         """
@@ -253,6 +342,8 @@ class Users:
             group_list: ID групп через запятую.
             id_list: ID пользователей через запятую.
             organization_list: ID компаний через запятую.
+            as_records: Отдавать UserRecord (__slots__) вместо dict — меньше памяти.
+            checkpoint: export.Checkpoint — продолжить с места прошлого падения.
             **kwargs: Дополнительные фильтры (from_date_created, to_date_created,
                       from_date_updated, to_date_updated, order_by).
         """
@@ -264,7 +355,12 @@ class Users:
             "organization_list": organization_list,
             **kwargs,
         }
-        return self._api._paginate_lazy(self.get_users_page, params)
+        return self._api._paginate_lazy(
+            self.get_users_page,
+            params,
+            record_cls=UserRecord if as_records else None,
+            checkpoint=checkpoint,
+        )
 
     def get_users_all(
         self,
@@ -273,6 +369,7 @@ class Users:
         group_list: str | None = None,
         id_list: str | None = None,
         organization_list: str | None = None,
+        as_records: bool = False,
         **kwargs: Unpack[GetUsersExtraParams],
     ):
         """
@@ -287,6 +384,7 @@ class Users:
             group_list: ID групп через запятую.
             id_list: ID пользователей через запятую.
             organization_list: ID компаний через запятую.
+            as_records: Отдавать UserRecord (__slots__) вместо dict — меньше памяти.
             **kwargs: Дополнительные фильтры (from_date_created, to_date_created,
                       from_date_updated, to_date_updated, order_by).
         """
@@ -298,4 +396,6 @@ class Users:
             "organization_list": organization_list,
             **kwargs,
         }
-        return self._api._paginate_all(self.get_users_page, params)
\ No newline at end of file
+        return self._api._paginate_all(
+            self.get_users_page, params, record_cls=UserRecord if as_records else None
+        )
\ No newline at end of file
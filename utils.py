@@ -49,6 +49,17 @@ def serialise_params(obj: Any) -> dict[str, Any]:
             
     return data
 
+def extract_items(data: Any) -> Any:
+    """Достаёт список записей из ответа API (tickets/users/items/data)."""
+    if isinstance(data, dict):
+        for key in ["tickets", "users", "items", "data"]:
+            if key in data:
+                data = data[key]
+                break
+    if isinstance(data, dict):
+        data = list(data.values())
+    return data
+
 def _random_message(min_length=50, max_length=200) -> str:
     words = [
         "тестовое", "сообщение", "проверка", "гипотеза", "эксперимент",